@@ -0,0 +1,285 @@
+"""
+Read-only filesystem backend for zip and tar archives.
+
+Members are indexed once when the archive is opened. Zip members and those of
+uncompressed tars are decompressed lazily as the walker reads them. Compressed
+tars can't be read out of order without restarting decompression from the
+start of the archive, so they are decompressed once, in archive order, and
+only the bytes the walker will read are kept in a temporary file that members
+are then read from.
+
+Hard and symbolic links in tars are served as the files they point to, as in
+an extracted tree. Links to directories, or to paths outside of the archive,
+are left out.
+"""
+
+import io
+import os
+import posixpath
+import shutil
+import stat
+import tarfile
+import tempfile
+import time
+import zipfile
+
+
+class ArchiveEntry:
+    """An `os.DirEntry`-like view of an archive member."""
+
+    def __init__(self, name, path, is_dir, size=0, mtime=0.0, ino=0, is_symlink=False):
+        self.name = name
+        self.path = path
+        self._is_dir = is_dir
+        self._is_symlink = is_symlink
+        mode = stat.S_IFDIR | 0o755 if is_dir else stat.S_IFREG | 0o644
+        self._stat = os.stat_result((mode, ino, 0, 1, 0, 0, size, mtime, mtime, mtime))
+
+    def is_dir(self, follow_symlinks=True):
+        return self._is_dir
+
+    def is_file(self, follow_symlinks=True):
+        return not self._is_dir
+
+    def is_symlink(self):
+        return self._is_symlink
+
+    def inode(self):
+        # Members get distinct inodes, shared only by links and their targets
+        return self._stat.st_ino
+
+    def stat(self, follow_symlinks=True):
+        return self._stat
+
+
+def _normalize_member_name(name):
+    """
+    Normalize an archive member name to a relative POSIX path.
+
+    Returns:
+    - str: The normalized path, or an empty string for members that should be ignored.
+    """
+    parts = [
+        part for part in name.replace("\\", "/").split("/") if part not in ("", ".")
+    ]
+    if ".." in parts:
+        return ""
+    return "/".join(parts)
+
+
+class SpooledMember(io.RawIOBase):
+    """A read-only stream over a member spooled into a temporary file."""
+
+    def __init__(self, spool, offset, size):
+        self._spool = spool
+        self._offset = offset
+        self._size = size
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        length = min(len(buffer), self._size - self._position)
+        if length <= 0:
+            return 0
+        # The spool is shared between members, so every read seeks first
+        self._spool.seek(self._offset + self._position)
+        data = self._spool.read(length)
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+class ArchiveFileSystem:
+    """
+    Filesystem backend serving the members of a zip or tar archive.
+
+    Paths are relative POSIX paths inside the archive, and the root of the
+    archive is the empty string.
+    """
+
+    def __init__(self, archive_path, read_limit=None):
+        """
+        Args:
+        - archive_path (str): Path to the zip or tar archive.
+        - read_limit (callable, optional): Function of the path of a member, returning the
+                                           number of its leading bytes the walker may read,
+                                           0 for none, or None for all of them. Only those
+                                           bytes of compressed tar members are kept.
+        """
+        self._archive_path = archive_path
+        self._read_limit = read_limit or (lambda path: None)
+        self._children = {"": {}}
+        self._members = {}
+        self._links = []
+        self._inodes = 0
+        self._spool = None
+        self._spooled = {}
+
+        if zipfile.is_zipfile(archive_path):
+            self._archive = zipfile.ZipFile(archive_path)
+            for info in self._archive.infolist():
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                self._add_member(
+                    info.filename, info, info.is_dir(), info.file_size, mtime
+                )
+        else:
+            try:
+                self._archive = tarfile.open(archive_path, "r:")
+            except tarfile.ReadError:
+                self._archive = None
+                self._spool_tar()
+            else:
+                for info in self._archive.getmembers():
+                    self._add_tar_member(info, info)
+            self._resolve_links()
+
+    def _add_tar_member(self, info, content):
+        if info.issym() or info.islnk():
+            self._links.append(info)
+        # Special files have no content of their own to display
+        elif info.isdir() or info.isfile():
+            self._add_member(
+                info.name, content, info.isdir(), info.size, float(info.mtime)
+            )
+
+    def _spool_tar(self):
+        """Decompress a compressed tar sequentially, spooling what will be read to disk."""
+        self._spool = tempfile.TemporaryFile()
+        with tarfile.open(self._archive_path, "r|*") as archive:
+            for info in archive:
+                # Spooled members are identified by their path
+                path = _normalize_member_name(info.name)
+                if info.isfile() and path:
+                    limit = self._read_limit(path)
+                    if limit != 0:
+                        self._spool_member(path, archive.extractfile(info), limit)
+                self._add_tar_member(info, path)
+
+    def _spool_member(self, path, stream, limit=None):
+        offset = self._spool.seek(0, os.SEEK_END)
+        if limit is None:
+            shutil.copyfileobj(stream, self._spool)
+        else:
+            # The rest of the member is decompressed past, but never written
+            self._spool.write(stream.read(limit))
+        self._spooled[path] = (offset, self._spool.tell() - offset)
+
+    def _extract_member(self, path):
+        """Spool a member that wasn't expected to be read, in another pass over the archive."""
+        with tarfile.open(self._archive_path, "r|*") as archive:
+            for info in archive:
+                if info.isfile() and _normalize_member_name(info.name) == path:
+                    self._spool_member(path, archive.extractfile(info))
+
+    def _resolve_links(self):
+        """Serve links as the files they point to, following chains of links."""
+        resolved = True
+        while self._links and resolved:
+            resolved = False
+            for info in list(self._links):
+                if info.issym() and info.linkname.startswith("/"):
+                    self._links.remove(info)
+                    continue
+
+                target = info.linkname
+                if info.issym():
+                    target = posixpath.join(posixpath.dirname(info.name), target)
+                target = _normalize_member_name(posixpath.normpath(target))
+                if target not in self._members:
+                    continue
+
+                self._links.remove(info)
+                resolved = True
+                path = _normalize_member_name(info.name)
+                if not path:
+                    continue
+                parent, item = posixpath.split(path)
+                self._ensure_directory(parent)
+                target_stat = self.stat(target)
+                self._children[parent][item] = ArchiveEntry(
+                    item,
+                    path,
+                    False,
+                    target_stat.st_size,
+                    target_stat.st_mtime,
+                    target_stat.st_ino,
+                    info.issym(),
+                )
+                self._members[path] = self._members[target]
+
+    def _add_member(self, name, info, is_dir, size, mtime):
+        path = _normalize_member_name(name)
+        if not path:
+            return
+
+        parent, item = posixpath.split(path)
+        self._ensure_directory(parent)
+        self._inodes += 1
+        self._children[parent][item] = ArchiveEntry(
+            item, path, is_dir, size, mtime, self._inodes
+        )
+
+        if is_dir:
+            self._children.setdefault(path, {})
+        else:
+            self._members[path] = info
+
+    def _ensure_directory(self, path):
+        """Register `path` and its ancestors, which archives may leave implicit."""
+        if path in self._children:
+            return
+
+        parent, item = posixpath.split(path)
+        self._ensure_directory(parent)
+        self._children[parent].setdefault(item, ArchiveEntry(item, path, True))
+        self._children[path] = {}
+
+    def scandir(self, path):
+        """Yield the entries of a directory inside the archive."""
+        if path not in self._children:
+            raise FileNotFoundError(f"No such directory in archive: '{path}'")
+        return iter(self._children[path].values())
+
+    def stat(self, path):
+        """Get the status of a member, or of the archive root for an empty path."""
+        if not path:
+            return ArchiveEntry("", "", True).stat()
+
+        parent, item = posixpath.split(path)
+        entry = self._children.get(parent, {}).get(item)
+        if entry is None:
+            raise FileNotFoundError(f"No such file in archive: '{path}'")
+        return entry.stat()
+
+    def open(self, path, mode="r", encoding=None, errors=None):
+        """Open a member for streaming, with the same signature as the builtin `open`."""
+        info = self._members.get(path)
+        if info is None:
+            raise FileNotFoundError(f"No such file in archive: '{path}'")
+
+        if self._spool is not None:
+            if info not in self._spooled:
+                self._extract_member(info)
+            stream = io.BufferedReader(SpooledMember(self._spool, *self._spooled[info]))
+        elif isinstance(self._archive, zipfile.ZipFile):
+            stream = self._archive.open(info)
+        else:
+            stream = self._archive.extractfile(info)
+
+        if "b" in mode:
+            return stream
+        return io.TextIOWrapper(stream, encoding=encoding, errors=errors)
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+        else:
+            self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
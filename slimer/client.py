@@ -0,0 +1,144 @@
+"""
+Thin client for a running `slimer serve` daemon.
+
+This module deliberately imports as little as possible so that a render
+request costs a socket round trip rather than a full interpreter warm-up.
+The arguments are forwarded untouched and rendered by the daemon, but the
+client parses them too and only ever writes where its own options say: the
+daemon's response never chooses the destination of the output.
+
+Usage:
+    $ slimer serve &
+    $ slimer-client /path/to/directory -l 500
+"""
+
+import json
+import os
+import socket
+import sys
+
+from slimer.main import parse_arguments, report_stats
+from slimer.sinks import open_sink
+
+
+def default_socket_path():
+    """
+    Get the unix socket path shared by the daemon and the client.
+
+    Returns:
+    - str: Value of `SLIMER_SOCKET`, or a per-user socket in the runtime directory.
+    """
+    if os.environ.get("SLIMER_SOCKET"):
+        return os.environ["SLIMER_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"  # nosec B108
+    return os.path.join(runtime_dir, f"slimer-{os.getuid()}.sock")
+
+
+def iter_render(argv, socket_path=None, cwd=None):
+    """
+    Send a render request to the daemon and yield its response as it arrives.
+
+    Args:
+    - argv (list): Command line arguments, as they would be passed to `slimer`.
+    - socket_path (str, optional): Path of the daemon socket.
+    - cwd (str, optional): Directory relative paths are resolved against.
+
+    Yields:
+    - dict: The decoded messages of the daemon: `{"section": ...}` messages, then
+            a last message with the exit status and an error or run statistics.
+    """
+    request = {"argv": argv, "cwd": cwd or os.getcwd()}
+    socket_path = socket_path or default_socket_path()
+
+    # Anyone can bind the shared /tmp fallback first, so only talk to our own daemon
+    if os.stat(socket_path).st_uid != os.getuid():
+        raise PermissionError(f"Socket '{socket_path}' is owned by another user.")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile("rb") as response:
+            for line in response:
+                message = json.loads(line)
+                yield message
+                if "status" in message:
+                    return
+    raise ConnectionError("The slimer daemon closed the connection mid-response.")
+
+
+def request_render(argv, socket_path=None, cwd=None):
+    """
+    Send a render request to the daemon and wait for its whole response.
+
+    Args:
+    - argv (list): Command line arguments, as they would be passed to `slimer`.
+    - socket_path (str, optional): Path of the daemon socket.
+    - cwd (str, optional): Directory relative paths are resolved against.
+
+    Returns:
+    - dict: The last message of the daemon, with the output sections under "sections".
+    """
+    sections = []
+    for message in iter_render(argv, socket_path, cwd):
+        if "section" in message:
+            sections.append(message["section"])
+    if sections:
+        message["sections"] = sections
+    return message
+
+
+def main():
+    """
+    Forward the command line to the daemon and stream its response to the sink.
+    """
+    argv = sys.argv[1:]
+    args = parse_arguments(argv)
+    if args.progress:
+        print("--progress is not available through the daemon.", file=sys.stderr)
+
+    try:
+        messages = iter_render(argv)
+        message = next(messages)
+    except OSError as e:
+        print(f"Could not reach the slimer daemon: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    # The sink is only opened once there is output, as the CLI would
+    sink = None
+    try:
+        while "section" in message:
+            if sink is None:
+                sink = open_sink(
+                    args.copy,
+                    args.output,
+                    args.compression_level,
+                    args.shard_size,
+                    args.shard_unit,
+                    args.max_memory,
+                    args.stdout,
+                )
+            sink.write(message["section"])
+            message = next(messages)
+        # Not aborted again below if closing it fails
+        finished, sink = sink, None
+        if finished is not None and message["status"]:
+            finished.abort()
+        elif finished is not None:
+            finished.close()
+    except Exception as e:
+        if sink is not None:
+            sink.abort()
+        print(f"An unexpected error occurred: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    if message.get("error"):
+        print(message["error"], file=sys.stderr)
+    if args.stats and message.get("stats") is not None:
+        report_stats(message["stats"])
+
+    sys.exit(message["status"])
+
+
+if __name__ == "__main__":
+    main()
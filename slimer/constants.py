@@ -100,8 +100,8 @@ SINGLE_LINE_COMMENT_PATTERNS = {
     "sql": DOUBLE_DASH_COMMENT_REGEX,
 }
 
-BLOCK_COMMENT_REGEX = r"/\*.*?\*/"
-DOCSTRING_REGEX = r"""(\'\'\'.*?\'\'\'|\"\"\".*?\"\"\")"""
+BLOCK_COMMENT_REGEX = r"(?s)/\*.*?\*/"
+DOCSTRING_REGEX = r"""(?s)(\'\'\'.*?\'\'\'|\"\"\".*?\"\"\")"""
 
 MULTI_LINE_COMMENT_PATTERNS = {
     "python": DOCSTRING_REGEX,
@@ -119,3 +119,83 @@ MULTI_LINE_COMMENT_PATTERNS = {
     "dart": BLOCK_COMMENT_REGEX,
     "groovy": BLOCK_COMMENT_REGEX,
 }
+
+ARCHIVE_FILE_EXTENSIONS = [
+    ".zip",
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.bz2",
+    ".tbz2",
+    ".tar.xz",
+    ".txz",
+]
+
+# Rough average used to estimate token counts from character counts
+CHARS_PER_TOKEN = 4
+
+# Languages whose indentation is purely cosmetic, so minification can remove it
+DEDENTABLE_LANGUAGES = ["json", "xml", "html"]
+
+NOTEBOOK_FILE_EXTENSION = ".ipynb"
+
+# Structured data files summarized with their schema and first records
+DATA_FILE_EXTENSIONS = [
+    ".json",
+    ".jsonl",
+    ".ndjson",
+    ".csv",
+    ".tsv",
+    ".yaml",
+    ".yml",
+    ".sql",
+]
+DATA_FILE_SUMMARY_MIN_SIZE = 32 * 1024
+
+# Code and data files, where a very long line means minified or generated content.
+# Prose (markdown, plain text) legitimately keeps whole paragraphs on one line.
+LONG_LINE_FILE_EXTENSIONS = [
+    extension
+    for extension, language in FILE_EXTENSION_MAPPINGS.items()
+    if language != "markdown"
+]
+LONG_LINE_FILE_EXTENSIONS += DATA_FILE_EXTENSIONS
+LONG_LINE_FILE_EXTENSIONS += [".mjs", ".cjs", ".jsx", ".tsx", ".map"]
+
+GENERATED_FILE_PATTERNS = [
+    "poetry.lock",
+    "Pipfile.lock",
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "Cargo.lock",
+    "Gemfile.lock",
+    "composer.lock",
+    "go.sum",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*_pb2.py",
+    "*_pb2.pyi",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "*.pb.h",
+    "*.pb.cc",
+]
+
+GENERATED_CONTENT_MARKERS = [
+    "@generated",
+    "do not edit",
+    "code generated",
+    "auto-generated",
+    "autogenerated",
+]
+
+# Leading blocks repeated at the top of many files, such as license banners
+SHARED_HEADER_MAX_LINES = 40
+SHARED_HEADER_MIN_LINES = 5
+SHARED_HEADER_MIN_FILES = 3
+
+# Directory listings workers may hold ahead of the walker with --workers
+PARALLEL_MAX_PENDING_LISTINGS = 256
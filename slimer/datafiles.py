@@ -0,0 +1,296 @@
+"""
+Schema-plus-sample summaries of large structured data files.
+
+Truncating a data dump after a number of characters usually cuts a record in
+half and says nothing about the rest of the file. Large JSON, JSON Lines, CSV,
+YAML and SQL files are instead summarized with their inferred schema, their
+record counts and their first records. Files are read as a stream, and only
+the sampled records are kept in memory.
+"""
+
+import csv
+import json
+
+from slimer.notebook import JSONStream
+
+MAX_SAMPLE_LINE_LENGTH = 200
+MAX_SCHEMA_FIELDS = 50
+
+
+def shorten(line, length=MAX_SAMPLE_LINE_LENGTH):
+    """Shorten a sample line to a maximum length."""
+    return line if len(line) <= length else f"{line[:length]}..."
+
+
+def get_json_type(value):
+    """Get the name of the JSON type of a decoded value."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "int" if isinstance(value, int) else "float"
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, list):
+        return "list"
+    return "object"
+
+
+def get_text_type(value):
+    """Infer the type of a textual value, as found in CSV cells."""
+    if not value:
+        return "null"
+    for parse, name in ((int, "int"), (float, "float")):
+        try:
+            parse(value)
+            return name
+        except ValueError:
+            pass
+    return "str"
+
+
+def merge_schema(schema, record, get_type):
+    """
+    Add the fields of a record to a schema, mapping field names to the types seen.
+
+    Args:
+    - schema (dict): The schema, updated in place.
+    - record (dict): The record, mapping field names to values.
+    - get_type (callable): Function inferring the type of a value.
+    """
+    for field, value in record.items():
+        types = schema.setdefault(field, [])
+        value_type = get_type(value)
+        if value_type not in types:
+            types.append(value_type)
+
+
+def format_schema(schema):
+    """Format a schema, one field per line."""
+    return "".join(
+        f"  {field}: {' | '.join(types)}\n" for field, types in schema.items()
+    )
+
+
+def format_records(records, total, noun):
+    """
+    Format a summary made of a schema and a sample of records.
+
+    Args:
+    - records (list): The sampled records, formatted as lines.
+    - total (int): The total number of records.
+    - noun (str): The name of the records, such as "rows".
+
+    Returns:
+    - str: The count of records and the sample.
+    """
+    summary = f"{total:,} {noun}\n"
+    if records:
+        summary += f"first {len(records)} {noun}:\n"
+        summary += "".join(f"  {shorten(record)}\n" for record in records)
+    return summary
+
+
+def summarize_json_records(records, sample_size):
+    """
+    Summarize a stream of JSON records.
+
+    Args:
+    - records (iterable): The decoded records.
+    - sample_size (int): Number of records to display.
+
+    Returns:
+    - tuple: The schema of object records, the sampled records and the record count.
+    """
+    schema = {}
+    sample = []
+    total = 0
+    for record in records:
+        total += 1
+        if total <= sample_size:
+            if isinstance(record, dict):
+                merge_schema(schema, record, get_json_type)
+            sample.append(json.dumps(record, ensure_ascii=False))
+    return schema, sample, total
+
+
+def summarize_json(file, sample_size):
+    """Summarize a JSON document, streaming through top-level arrays."""
+    stream = JSONStream(file)
+    if stream.peek() == "[":
+        schema, sample, total = summarize_json_records(stream.elements(), sample_size)
+        summary = f"array of {total:,} elements\n"
+        if schema:
+            summary += f"element fields:\n{format_schema(schema)}"
+        return summary + format_records(sample, total, "elements")
+
+    if stream.peek() != "{":
+        return f"{get_json_type(stream.value())}\n"
+
+    summary = ""
+    keys = 0
+    for key in stream.items():
+        keys += 1
+        if keys > MAX_SCHEMA_FIELDS:
+            # Values are still decoded one at a time, to reach the end of the object
+            stream.value()
+        elif stream.peek() == "[":
+            schema, sample, total = summarize_json_records(
+                stream.elements(), sample_size
+            )
+            summary += f"  {key}: list of {total:,} elements\n"
+            summary += "".join(
+                f"    {field}: {' | '.join(types)}\n" for field, types in schema.items()
+            )
+            summary += "".join(f"    {shorten(record)}\n" for record in sample)
+        else:
+            value = stream.value()
+            if isinstance(value, dict):
+                fields = ", ".join(list(value)[:sample_size])
+                more = ", ..." if len(value) > sample_size else ""
+                summary += f"  {key}: object {{{fields}{more}}}\n"
+            else:
+                summary += (
+                    f"  {key}: {get_json_type(value)} = {shorten(json.dumps(value))}\n"
+                )
+
+    more = f" (first {MAX_SCHEMA_FIELDS} shown)" if keys > MAX_SCHEMA_FIELDS else ""
+    return f"object with {keys:,} keys{more}\n{summary}"
+
+
+def summarize_json_lines(file, sample_size):
+    """Summarize a JSON Lines file, one record per line."""
+    records = (json.loads(line) for line in file if line.strip())
+    schema, sample, total = summarize_json_records(records, sample_size)
+    summary = f"fields:\n{format_schema(schema)}" if schema else ""
+    return summary + format_records(sample, total, "records")
+
+
+def summarize_csv(file, sample_size, delimiter=","):
+    """Summarize a CSV file from its header row and first rows."""
+    reader = csv.reader(file, delimiter=delimiter)
+    columns = next(reader, [])
+    schema = {column: [] for column in columns}
+    sample = []
+    total = 0
+    for row in reader:
+        total += 1
+        if total <= sample_size:
+            merge_schema(schema, dict(zip(columns, row)), get_text_type)
+            sample.append(delimiter.join(row))
+    return f"columns:\n{format_schema(schema)}" + format_records(sample, total, "rows")
+
+
+def summarize_yaml(file, sample_size):
+    """
+    Summarize a YAML file from its top-level keys and sequence items.
+
+    The structure is read from indentation alone, so no YAML parser is needed.
+    """
+    keys = []
+    key_count = 0
+    items = []
+    item_count = 0
+    documents = 0
+    current = None
+    first_child = False
+    for line in file:
+        stripped = line.strip()
+        if line.startswith("---"):
+            # Separators open documents, the first of which may be implicit
+            documents += 1
+            current = None
+        elif not stripped or stripped.startswith("#"):
+            continue
+        elif line[0] not in " \t-":
+            key, _, value = line.partition(":")
+            current = [key.strip(), "scalar" if value.strip() else "mapping"]
+            first_child = not value.strip()
+            key_count += 1
+            if key_count <= MAX_SCHEMA_FIELDS:
+                keys.append(current)
+            documents = max(documents, 1)
+        elif current is None:
+            if line.startswith("-"):
+                item_count += 1
+                if item_count <= sample_size:
+                    items.append(line.rstrip("\n"))
+                documents = max(documents, 1)
+        elif first_child:
+            if stripped.startswith("-"):
+                current[1] = "sequence"
+            first_child = False
+
+    summary = f"{documents:,} documents\n" if documents > 1 else ""
+    if keys:
+        more = f" (first {MAX_SCHEMA_FIELDS} shown)" if key_count > len(keys) else ""
+        summary += f"{key_count:,} keys{more}:\n"
+        summary += "".join(f"  {key}: {kind}\n" for key, kind in keys)
+    if item_count:
+        summary += format_records(items, item_count, "items")
+    return summary
+
+
+def summarize_sql(file, sample_size):
+    """Summarize a SQL dump with its table definitions and its inserts per table."""
+    definitions = []
+    inserts = {}
+    sample = []
+    statement = None
+    for line in file:
+        upper = line.lstrip().upper()
+        if statement is not None:
+            statement.append(line)
+            if line.rstrip().endswith(";"):
+                definitions.append("".join(statement))
+                statement = None
+        elif upper.startswith("CREATE "):
+            statement = [line]
+            if line.rstrip().endswith(";"):
+                definitions.append(line)
+                statement = None
+        elif upper.startswith("INSERT INTO"):
+            table = line.split()[2].split("(")[0].strip('`"[]')
+            inserts[table] = inserts.get(table, 0) + 1
+            if len(sample) < sample_size:
+                sample.append(line.strip())
+
+    summary = "".join(definitions)
+    summary += "".join(
+        f"-- {count:,} inserts into {table}\n" for table, count in inserts.items()
+    )
+    return summary + "".join(f"{shorten(line)}\n" for line in sample)
+
+
+DATA_SUMMARIZERS = {
+    ".json": summarize_json,
+    ".jsonl": summarize_json_lines,
+    ".ndjson": summarize_json_lines,
+    ".csv": summarize_csv,
+    ".tsv": lambda file, sample_size: summarize_csv(file, sample_size, "\t"),
+    ".yaml": summarize_yaml,
+    ".yml": summarize_yaml,
+    ".sql": summarize_sql,
+}
+
+
+def summarize_data_file(item_path, extension, fs, sample_size):
+    """
+    Summarize a structured data file.
+
+    Args:
+    - item_path (str): Path to the file.
+    - extension (str): Extension of the file, which selects its format.
+    - fs (object): Filesystem backend to read from.
+    - sample_size (int): Number of records to display.
+
+    Returns:
+    - str: The summary, or None if the file can't be parsed as its format.
+    """
+    summarizer = DATA_SUMMARIZERS[extension]
+    with fs.open(item_path, "r", encoding="utf-8", errors="replace") as file:
+        try:
+            return summarizer(file, sample_size)
+        except (ValueError, IndexError, csv.Error):
+            return None
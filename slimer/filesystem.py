@@ -0,0 +1,313 @@
+"""
+Filesystem backends used by the directory walker.
+
+A backend exposes the operations the walker needs: `scandir`, which yields
+`os.DirEntry`-like objects for the children of a directory, and `stat` and `open`,
+which mirror `os.stat` and the builtin `open`. The local backend delegates to the operating system,
+while other backends (such as archives) serve the same interface from elsewhere.
+"""
+
+import os
+import sys
+
+from slimer.constants import ARCHIVE_FILE_EXTENSIONS, PARALLEL_MAX_PENDING_LISTINGS
+
+
+class LocalFileSystem:
+    """Filesystem backend that reads directly from the operating system."""
+
+    def scandir(self, path):
+        """Yield the entries of a directory, closing the handle once exhausted."""
+        with os.scandir(path) as entries:
+            yield from entries
+
+    def stat(self, path):
+        """Get the status of a path, following symlinks."""
+        return os.stat(path)
+
+    def open(self, path, mode="r", encoding=None, errors=None):
+        """Open a file, with the same signature as the builtin `open`."""
+        return open(path, mode, encoding=encoding, errors=errors)
+
+    def close(self):
+        """Nothing to release for the local filesystem."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParallelFileSystem(LocalFileSystem):
+    """
+    Local filesystem backend that lists directories ahead of the walker in a pool of workers.
+
+    Whenever a directory is listed, its subdirectories are queued, and idle workers pull
+    them from the shared queue, list and stat them concurrently, and queue their own
+    subdirectories in turn. The walker still consumes listings in its own serial order,
+    so the output is identical to a serial walk. When the walker needs a directory no
+    worker has started on yet, it lists it itself rather than waiting in the queue.
+
+    Listing and stat calls release the GIL, so threads scale with the latency of the
+    storage without the cost of moving entries between processes. Only directories the
+    walker will enter are prefetched, and at most `max_pending` listings are held ahead
+    of it, so memory stays bounded however far ahead the workers could get.
+    """
+
+    def __init__(
+        self,
+        workers,
+        exclude=None,
+        depth_limit=None,
+        stat_files=False,
+        max_entries=None,
+        modified_since=None,
+        max_pending=PARALLEL_MAX_PENDING_LISTINGS,
+    ):
+        """
+        Args:
+        - workers (int): Number of directories listed concurrently.
+        - exclude (callable, optional): Predicate on names of entries the walker excludes.
+        - depth_limit (int, optional): Depth below which directories aren't prefetched.
+        - stat_files (bool, optional): Whether workers also stat files, besides directories.
+        - max_entries (int, optional): Number of entries the walker displays per directory.
+                                       Directories past it aren't prefetched.
+        - modified_since (float, optional): Timestamp before which the walker skips entries.
+        - max_pending (int, optional): Maximum number of listings held ahead of the walker.
+        """
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.exclude = exclude
+        self.depth_limit = depth_limit
+        self.stat_files = stat_files
+        self.max_entries = max_entries
+        self.modified_since = modified_since
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(workers)
+        self._lock = threading.Lock()
+        self._listings = {}
+        self._prefetched = set()
+        self._root_depth = None
+
+    def scandir(self, path):
+        with self._lock:
+            future = self._listings.pop(path, None)
+
+        if future is None or future.cancel():
+            return iter(self._list_directory(path))
+        return iter(future.result())
+
+    def _list_directory(self, path):
+        """List and stat the entries of a directory, and queue its subdirectories."""
+        with os.scandir(path) as entries:
+            entries = list(entries)
+
+        if self._root_depth is None:
+            self._root_depth = path.count(os.sep)
+        depth = path.count(os.sep) - self._root_depth + 1
+
+        # The walker only displays the first names of directories, once excluded ones are dropped
+        displayed = None
+        if self.max_entries is not None:
+            import heapq
+
+            names = (e.name for e in entries if not self._is_excluded(e.name))
+            displayed = set(heapq.nsmallest(self.max_entries, names))
+
+        for entry in entries:
+            try:
+                # Directory entries cache their stat, so the walker won't stat again
+                if self.stat_files or entry.is_dir():
+                    stat = entry.stat()
+            except OSError:
+                continue
+
+            # Symlinked directories are listed by the walker, which guards against loops
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            if self.depth_limit is not None and depth >= self.depth_limit:
+                continue
+            if self._is_excluded(entry.name):
+                continue
+            if displayed is not None and entry.name not in displayed:
+                continue
+            if self.modified_since is not None and stat.st_mtime < self.modified_since:
+                continue
+
+            with self._lock:
+                # The walker skips directories it has already visited
+                identity = (stat.st_dev, stat.st_ino)
+                if identity in self._prefetched:
+                    continue
+                if len(self._listings) >= self.max_pending:
+                    continue
+                self._prefetched.add(identity)
+                self._listings[entry.path] = self._pool.submit(
+                    self._list_directory, entry.path
+                )
+
+        return entries
+
+    def _is_excluded(self, name):
+        return self.exclude is not None and self.exclude(name)
+
+    def close(self):
+        """Stop the workers, dropping the directories they haven't listed yet."""
+        self._pool.shutdown(cancel_futures=True)
+
+
+class ListedEntry:
+    """An `os.DirEntry`-like view of a path from a file list."""
+
+    def __init__(self, name, path, is_dir):
+        self.name = name
+        self.path = path
+        self._is_dir = is_dir
+
+    def is_dir(self, follow_symlinks=True):
+        return self._is_dir
+
+    def is_symlink(self):
+        return False
+
+    def inode(self):
+        # Listed files are taken as given, so they are never treated as duplicates
+        return 0
+
+    def stat(self, follow_symlinks=True):
+        return os.stat(self.path, follow_symlinks=follow_symlinks)
+
+
+class ListedFileSystem(LocalFileSystem):
+    """
+    Local filesystem backend whose tree is built from a list of file paths.
+
+    Directories are implied by the paths listed, so the disk is never listed and
+    the cost of a walk is proportional to the length of the list. File contents
+    are still read from the disk.
+    """
+
+    def __init__(self, root, paths):
+        """
+        Args:
+        - root (str): Absolute path of the directory the tree is rooted at.
+        - paths (iterable): Paths of the files, relative to `root` or absolute.
+                            Listed directories are displayed even without listed
+                            children. Paths outside of `root` or missing from the
+                            disk are ignored.
+        """
+        self.root = os.path.normpath(root)
+        self._children = {self.root: {}}
+
+        for path in paths:
+            listed_as_directory = path.endswith(("/", os.sep))
+            path = os.path.normpath(os.path.join(self.root, path))
+            if path == self.root or os.path.commonpath((self.root, path)) != self.root:
+                continue
+
+            if not os.path.exists(path):
+                continue
+            if listed_as_directory or os.path.isdir(path):
+                self._ensure_directory(path)
+                continue
+
+            parent, name = os.path.split(path)
+
+            self._ensure_directory(parent)
+            self._children[parent].setdefault(name, ListedEntry(name, path, False))
+
+    def _ensure_directory(self, path):
+        """Register `path` and its ancestors up to the root."""
+        if path in self._children:
+            return
+
+        parent, name = os.path.split(path)
+        self._ensure_directory(parent)
+        self._children[parent][name] = ListedEntry(name, path, True)
+        self._children[path] = {}
+
+    def scandir(self, path):
+        return iter(self._children.get(os.path.normpath(path), {}).values())
+
+
+def iter_listed_paths(stream, chunk_size=64 * 1024):
+    """
+    Stream the paths of a NUL or newline separated file list.
+
+    The list is NUL separated when its first chunk contains a NUL byte, as
+    written by `git ls-files -z` or `fd -0`, and newline separated otherwise.
+
+    Args:
+    - stream (file): Binary stream to read the list from.
+    - chunk_size (int, optional): Number of bytes read at a time.
+
+    Yields:
+    - str: The non-empty paths of the list.
+    """
+    separator = None
+    pending = b""
+
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        if separator is None:
+            separator = b"\0" if b"\0" in chunk else b"\n"
+        *paths, pending = (pending + chunk).split(separator)
+        yield from decode_listed_paths(paths, separator)
+
+    yield from decode_listed_paths([pending], separator)
+
+
+def decode_listed_paths(paths, separator):
+    """Decode the non-empty paths of a file list, dropping carriage returns from lines."""
+    for path in paths:
+        if separator == b"\n":
+            path = path.rstrip(b"\r")
+        if path:
+            yield os.fsdecode(path)
+
+
+def open_file_list(list_path, root):
+    """
+    Open a filesystem backend serving the files listed in a file, or in stdin for "-".
+
+    Args:
+    - list_path (str): Path of the file list, or "-" to read it from stdin.
+    - root (str): Absolute path of the directory the listed paths are relative to.
+
+    Returns:
+    - ListedFileSystem: The filesystem backend.
+    """
+    if list_path == "-":
+        return ListedFileSystem(root, iter_listed_paths(sys.stdin.buffer))
+
+    with open(list_path, "rb") as stream:
+        return ListedFileSystem(root, iter_listed_paths(stream))
+
+
+def is_archive(path):
+    """Check if the provided path is a file with a supported archive extension."""
+    lower_path = path.lower()
+    return os.path.isfile(path) and any(
+        lower_path.endswith(ext) for ext in ARCHIVE_FILE_EXTENSIONS
+    )
+
+
+def open_filesystem(path, read_limit=None):
+    """
+    Open the filesystem backend suited to the provided path.
+
+    Args:
+    - path (str): Absolute path of a directory or a supported archive.
+    - read_limit (callable, optional): For archives, function of the path of a member
+                                       returning how many of its bytes will be read.
+
+    Returns:
+    - tuple: The filesystem backend and the root path to walk within it.
+    """
+    if is_archive(path):
+        from slimer.archive import ArchiveFileSystem
+
+        return ArchiveFileSystem(path, read_limit), ""
+
+    return LocalFileSystem(), path
@@ -0,0 +1,180 @@
+"""
+Detection of boilerplate headers shared across files.
+
+License banners and generated preambles are usually repeated verbatim at the
+top of many files. A pre-pass reads the first lines of every file and chains
+a hash over them, line by line, so that each prefix of a file is summarized by
+a single number. Prefixes shared by enough files are displayed once, and elided
+from the files they start.
+"""
+
+import itertools
+import os
+
+from slimer.constants import (
+    SHARED_HEADER_MAX_LINES,
+    SHARED_HEADER_MIN_FILES,
+    SHARED_HEADER_MIN_LINES,
+)
+from slimer.main import is_binary_file, list_directory
+
+
+def iter_header_candidates(
+    fs, directory, exclusion_patterns, depth_limit=None, file_extensions=None, depth=0
+):
+    """
+    Yield the paths of the files whose headers are compared.
+
+    Args:
+    - fs (object): Filesystem backend to walk.
+    - directory (str): Path to the directory to walk.
+    - exclusion_patterns (set): Patterns used to exclude filenames or directory names.
+    - depth_limit (int, optional): Maximum depth to explore in the directory structure.
+    - file_extensions (list, optional): List of file extensions to exclusively consider.
+    - depth (int, optional): Current depth of recursion. Defaults to 0.
+
+    Yields:
+    - str: Paths of the text files of the tree.
+    """
+    if depth_limit is not None and depth >= depth_limit:
+        return
+
+    entries, _ = list_directory(fs, directory, exclusion_patterns)
+    for entry in entries:
+        if entry.is_dir():
+            # Symlinked directories are left out, so the pre-pass can't loop
+            if not entry.is_symlink():
+                yield from iter_header_candidates(
+                    fs,
+                    entry.path,
+                    exclusion_patterns,
+                    depth_limit,
+                    file_extensions,
+                    depth + 1,
+                )
+        elif not is_binary_file(entry.name):
+            extension = os.path.splitext(entry.name)[1]
+            if not file_extensions or extension in file_extensions:
+                yield entry.path
+
+
+def read_leading_lines(item_path, fs, max_lines):
+    """Read up to `max_lines` lines from the start of a file, keeping line endings."""
+    with fs.open(item_path, "r", encoding="utf-8", errors="replace") as file:
+        return list(itertools.islice(file, max_lines))
+
+
+def hash_prefixes(lines):
+    """
+    Hash every prefix of a list of lines, each hash chained from the previous one.
+
+    Args:
+    - lines (list): The leading lines of a file.
+
+    Returns:
+    - list: The hash of the first `k + 1` lines at index `k`.
+    """
+    hashes = []
+    current = 0
+    for line in lines:
+        current = hash((current, line))
+        hashes.append(current)
+    return hashes
+
+
+def find_shared_headers(
+    fs,
+    paths,
+    max_lines=SHARED_HEADER_MAX_LINES,
+    min_lines=SHARED_HEADER_MIN_LINES,
+    min_files=SHARED_HEADER_MIN_FILES,
+):
+    """
+    Find the leading blocks of lines repeated across files.
+
+    Each file is assigned its longest prefix of at least `min_lines` lines that
+    starts at least `min_files` files. Since a file sharing a prefix also shares
+    all of its shorter prefixes, the counts only decrease along a file's prefixes.
+
+    Args:
+    - fs (object): Filesystem backend to read from.
+    - paths (iterable): Paths of the files to compare.
+    - max_lines (int, optional): Maximum length of a header, in lines.
+    - min_lines (int, optional): Minimum length of a header, in lines.
+    - min_files (int, optional): Minimum number of files a header must start.
+
+    Returns:
+    - dict: The text of each shared header, mapped to its number and the number of
+            files it starts, in order of first appearance.
+    """
+    counts = {}
+    chains = []
+    for path in paths:
+        try:
+            lines = read_leading_lines(path, fs, max_lines)
+        except OSError:
+            continue
+
+        skipped = min_lines - 1
+        chain = hash_prefixes(lines)[skipped:]
+        for prefix_hash in chain:
+            counts[prefix_hash] = counts.get(prefix_hash, 0) + 1
+        chains.append((path, chain))
+
+    chosen = {}
+    for path, chain in chains:
+        shared = [
+            prefix_hash for prefix_hash in chain if counts[prefix_hash] >= min_files
+        ]
+        if shared:
+            chosen.setdefault(shared[-1], (path, min_lines + len(shared) - 1))
+
+    headers = {}
+    for prefix_hash, (path, length) in chosen.items():
+        block = "".join(read_leading_lines(path, fs, length))
+        if block.strip() and block not in headers:
+            headers[block] = (len(headers) + 1, counts[prefix_hash])
+    return headers
+
+
+def format_shared_header(block, number, file_count):
+    """
+    Format a shared header, displayed once before the files it was elided from.
+
+    Args:
+    - block (str): The text of the header.
+    - number (int): The number of the header, referenced by the files it was elided from.
+    - file_count (int): The number of files the header starts.
+
+    Returns:
+    - str: The formatted section.
+    """
+    return (
+        f"-- shared header {number} (elided from {file_count:,} files)\n"
+        f"```\n"
+        f"{block}"
+        f"```\n"
+    )
+
+
+def strip_shared_header(content, shared_headers):
+    """
+    Remove the longest shared header a file starts with, unless it is the whole file.
+
+    Args:
+    - content (str): The content of the file.
+    - shared_headers (dict): Shared headers, as returned by `find_shared_headers`.
+
+    Returns:
+    - tuple: The remaining content, and the number of the header removed or None.
+    """
+    removed, number = "", None
+    for block, (block_number, _) in shared_headers.items():
+        if len(block) > len(removed) and content.startswith(block):
+            removed, number = block, block_number
+
+    length = len(removed)
+    remaining = content[length:]
+    if number is None or not remaining.strip():
+        return content, None
+    return remaining, number
@@ -0,0 +1,249 @@
+"""
+Persistent metadata index for repeated runs over the same tree.
+
+File metadata (path, parent, depth, size, mtime, language and binary flag) is
+kept in a SQLite database between runs. A directory is only listed again when
+its mtime changed since it was indexed; otherwise its children are served from
+the index as they are, without touching them on disk. Creating, deleting or
+renaming a file changes the mtime of its directory, and so does saving a file
+through a temporary file, as most editors do. A file rewritten in place keeps
+its indexed size and mtime until its directory changes, although its content is
+always read from disk. Deleting the index rebuilds it from scratch.
+
+Filters known upfront, such as recency, extensions and binary files, are
+applied by a single query over the whole subtree on the first listing, rather
+than by a query per directory.
+"""
+
+import os
+import sqlite3
+
+from slimer.constants import BINARY_FILE_EXTENSIONS, FILE_EXTENSION_MAPPINGS
+from slimer.filesystem import LocalFileSystem
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    is_dir INTEGER NOT NULL,
+    is_symlink INTEGER NOT NULL,
+    mode INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    dev INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    extension TEXT NOT NULL,
+    language TEXT NOT NULL,
+    binary INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent, name);
+CREATE INDEX IF NOT EXISTS entries_mtime ON entries (mtime_ns);
+CREATE TABLE IF NOT EXISTS listings (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+COLUMNS = "path, name, is_dir, is_symlink, mode, inode, ino, dev, size, mtime_ns"
+
+
+class IndexedEntry:
+    """An `os.DirEntry`-like view of an indexed row."""
+
+    def __init__(self, row):
+        self.path, self.name, is_dir, is_symlink, mode, inode, ino, dev = row[:8]
+        size, mtime_ns = row[8:]
+        self._is_dir = bool(is_dir)
+        self._is_symlink = bool(is_symlink)
+        self._inode = inode
+        # The float and nanosecond times follow the ten integer fields
+        seconds, mtime = mtime_ns // 10**9, mtime_ns / 1e9
+        times = (seconds,) * 3 + (mtime,) * 3 + (mtime_ns,) * 3
+        self._stat = os.stat_result((mode, ino, dev, 1, 0, 0, size, *times))
+
+    def is_dir(self, follow_symlinks=True):
+        return self._is_dir
+
+    def is_symlink(self):
+        return self._is_symlink
+
+    def inode(self):
+        return self._inode
+
+    def stat(self, follow_symlinks=True):
+        return self._stat
+
+
+def get_entry_row(entry):
+    """
+    Build the index row of a directory entry.
+
+    Args:
+    - entry (DirEntry): The directory entry, as listed by `os.scandir`.
+
+    Returns:
+    - tuple: The values of the row, or None if the entry can't be stat'ed.
+    """
+    try:
+        stat = entry.stat()
+    except OSError:
+        # Broken symlinks can't be displayed either
+        return None
+
+    extension = os.path.splitext(entry.name)[1]
+    return (
+        entry.path,
+        os.path.dirname(entry.path),
+        entry.name,
+        entry.path.count(os.sep),
+        entry.is_dir(),
+        entry.is_symlink(),
+        stat.st_mode,
+        entry.inode(),
+        stat.st_ino,
+        stat.st_dev,
+        stat.st_size,
+        stat.st_mtime_ns,
+        extension,
+        FILE_EXTENSION_MAPPINGS.get(extension, ""),
+        extension in BINARY_FILE_EXTENSIONS,
+    )
+
+
+class IndexedFileSystem(LocalFileSystem):
+    """
+    Local filesystem backend whose listings are served from a SQLite index.
+
+    Each directory is refreshed when it is listed, so only the part of the tree
+    actually walked is checked against the disk. Changes are committed when the
+    filesystem is closed.
+    """
+
+    def __init__(
+        self,
+        index_path,
+        modified_since=None,
+        file_extensions=None,
+        include_binary=True,
+    ):
+        """
+        Args:
+        - index_path (str): Path of the SQLite database, created if missing.
+        - modified_since (float, optional): Only list entries modified after this timestamp.
+        - file_extensions (list, optional): Only list files with these extensions.
+        - include_binary (bool, optional): If False, files with binary extensions aren't listed.
+        """
+        self._connection = sqlite3.connect(index_path)
+        self._connection.executescript(SCHEMA)
+
+        conditions, self._parameters = [], []
+        if modified_since is not None:
+            conditions.append("mtime_ns >= ?")
+            self._parameters.append(int(modified_since * 1e9))
+        if file_extensions:
+            placeholders = ", ".join("?" * len(file_extensions))
+            conditions.append(f"(is_dir OR extension IN ({placeholders}))")
+            self._parameters.extend(file_extensions)
+        if not include_binary:
+            conditions.append("(is_dir OR NOT binary)")
+
+        # Conditions are fixed strings, values are always bound as parameters
+        where = "".join(f" AND {condition}" for condition in conditions)
+        self._query = f"SELECT {COLUMNS} FROM entries WHERE parent = ?{where}"  # nosec
+        self._subtree_query = None
+        if conditions:
+            self._subtree_query = (
+                f"SELECT parent, {COLUMNS} FROM entries"  # nosec
+                f" WHERE (parent = ? OR (parent > ? AND parent < ?)){where}"
+            )
+        # Filtered rows of the subtree, by parent, for directories that didn't change
+        self._subtree_root = None
+        self._subtree = None
+
+    def scandir(self, path):
+        if self._subtree is None and self._subtree_query is not None:
+            self._subtree_root = path
+            self._subtree = self._query_subtree(path)
+
+        relisted = self.refresh_directory(path)
+        # Unchanged directories of the subtree without a matching row have no entry
+        in_subtree = self._subtree is not None and (
+            os.path.join(path, "").startswith(os.path.join(self._subtree_root, ""))
+        )
+        if in_subtree and not relisted:
+            return map(IndexedEntry, self._subtree.get(path, []))
+        rows = self._connection.execute(self._query, [path] + self._parameters)
+        return map(IndexedEntry, rows.fetchall())
+
+    def _query_subtree(self, path):
+        """Get the filtered rows of a whole subtree, grouped by parent directory."""
+        # Paths below the directory sort between its prefix and the next separator
+        prefix = os.path.join(path, "")
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        rows = self._connection.execute(
+            self._subtree_query, [path, prefix, upper] + self._parameters
+        )
+
+        subtree = {}
+        for parent, *row in rows:
+            subtree.setdefault(parent, []).append(row)
+        return subtree
+
+    def refresh_directory(self, path):
+        """
+        Bring the indexed children of a directory up to date with the disk.
+
+        Args:
+        - path (str): Path of the directory.
+
+        Returns:
+        - bool: True if the directory changed and was listed again.
+        """
+        mtime_ns = os.stat(path).st_mtime_ns
+        listing = self._connection.execute(
+            "SELECT mtime_ns FROM listings WHERE path = ?", (path,)
+        ).fetchone()
+
+        if listing is not None and listing[0] == mtime_ns:
+            return False
+        self._relist_directory(path, mtime_ns)
+        return True
+
+    def _relist_directory(self, path, mtime_ns):
+        """Replace the indexed children of a directory with its current listing."""
+        with os.scandir(path) as entries:
+            rows = [row for row in map(get_entry_row, entries) if row is not None]
+
+        directories = {row[2] for row in rows if row[4]}
+        previous = self._connection.execute(
+            "SELECT path FROM entries WHERE parent = ? AND is_dir", (path,)
+        ).fetchall()
+        for (previous_path,) in previous:
+            if os.path.basename(previous_path) not in directories:
+                self._forget_subtree(previous_path)
+
+        self._connection.execute("DELETE FROM entries WHERE parent = ?", (path,))
+        self._connection.executemany(
+            "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._connection.execute(
+            "INSERT OR REPLACE INTO listings VALUES (?, ?)", (path, mtime_ns)
+        )
+
+    def _forget_subtree(self, path):
+        """Remove the rows of a deleted directory and everything below it."""
+        prefix = path + os.sep
+        for table, column in (("entries", "parent"), ("listings", "path")):
+            self._connection.execute(
+                f"DELETE FROM {table} WHERE {column} = ? OR substr({column}, 1, ?) = ?",  # nosec
+                (path, len(prefix), prefix),
+            )
+
+    def close(self):
+        """Persist the refreshed index and close the database."""
+        self._connection.commit()
+        self._connection.close()
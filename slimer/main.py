@@ -10,9 +10,11 @@ to customize the output. Some of the primary functionalities include:
 - Exclude or forcefully include specific files or directories.
 - Recognize and tag binary files, with an option to include/exclude them.
 - Limit the depth of directory exploration.
-- Copy the result to the clipboard or output to a file.
+- Copy the result to the clipboard or output to a file, optionally gzip or xz compressed.
 - Filter the displayed files based on their modification time.
 - Include specific files based on their extension.
+- Read zip and tar archives directly, without extracting them.
+- Serve repeated requests from a warm daemon (`slimer serve` and `slimer-client`).
 
 Usage:
     Run the script with python and provide the necessary arguments.
@@ -31,12 +33,10 @@ Date:
     03/10/2023
 """
 
-import argparse
-import fnmatch
+# Only cheap modules are imported eagerly. argparse, fnmatch, pyperclip, re and time
+# are imported where they are used, so runs that don't need them never pay for them.
 import os
-import pyperclip
-import re
-import time
+import sys
 
 from slimer.constants import (
     EXCLUDED_DIRECTORIES,
@@ -45,7 +45,22 @@ from slimer.constants import (
     FILE_EXTENSION_MAPPINGS,
     SINGLE_LINE_COMMENT_PATTERNS,
     MULTI_LINE_COMMENT_PATTERNS,
+    DEDENTABLE_LANGUAGES,
+    NOTEBOOK_FILE_EXTENSION,
+    DATA_FILE_EXTENSIONS,
+    DATA_FILE_SUMMARY_MIN_SIZE,
+    GENERATED_FILE_PATTERNS,
+    GENERATED_CONTENT_MARKERS,
+    LONG_LINE_FILE_EXTENSIONS,
 )
+from slimer.filesystem import (
+    LocalFileSystem,
+    ParallelFileSystem,
+    is_archive,
+    open_file_list,
+    open_filesystem,
+)
+from slimer.sinks import FileContentSection, copies_raw_bytes, open_sink
 from slimer.__version__ import __version__
 
 
@@ -55,6 +70,34 @@ def is_binary_file(filename):
     return ext in BINARY_FILE_EXTENSIONS
 
 
+def is_data_file(filename):
+    """Check if the provided filename has a structured data extension."""
+    _, ext = os.path.splitext(filename)
+    return ext in DATA_FILE_EXTENSIONS
+
+
+WILDCARD_CHARACTERS = "*?["
+
+_compiled_patterns = {}
+
+
+def compile_pattern(pattern):
+    """
+    Compile a regular expression once and reuse it on subsequent calls.
+
+    Args:
+    - pattern (str): The regular expression.
+
+    Returns:
+    - Pattern: The compiled regular expression.
+    """
+    if pattern not in _compiled_patterns:
+        import re
+
+        _compiled_patterns[pattern] = re.compile(pattern)
+    return _compiled_patterns[pattern]
+
+
 def should_exclude(item, exclusion_patterns):
     """
     Determines if an item should be excluded based on some conditions.
@@ -66,13 +109,26 @@ def should_exclude(item, exclusion_patterns):
     Returns:
     - bool: True if the item should be excluded, False otherwise.
     """
-    unix_path = item.replace(os.sep, "/").lower()
-    return any(
-        fnmatch.fnmatch(unix_path, pattern.lower()) for pattern in exclusion_patterns
-    )
+    unix_path = os.path.normcase(item.replace(os.sep, "/").lower())
+    for pattern in exclusion_patterns:
+        pattern = os.path.normcase(pattern.lower())
+        # Literal patterns are compared directly, without loading fnmatch and re
+        if not any(char in pattern for char in WILDCARD_CHARACTERS):
+            if unix_path == pattern:
+                return True
+            continue
 
+        import fnmatch
 
-def read_file_content(item_path, limit=None, chunk_size=4096):
+        if fnmatch.fnmatchcase(unix_path, pattern):
+            return True
+
+    return False
+
+
+def read_file_content(
+    item_path, limit=None, chunk_size=4096, opener=open, content_hash=None
+):
     """
     Read the content of a file up to a given limit using chunks.
 
@@ -80,6 +136,8 @@ def read_file_content(item_path, limit=None, chunk_size=4096):
     - item_path (str): Path to the file.
     - limit (int, optional): Maximum number of characters to read. Reads the entire file if not provided.
     - chunk_size (int, optional): Size of each chunk to be read from the file.
+    - opener (callable, optional): Function used to open the file, with the signature of `open`.
+    - content_hash (ContentHash, optional): Manifest hash fed with the raw bytes as they are read.
 
     Returns:
     - tuple: The content of the file and a flag indicating if the content was truncated.
@@ -87,7 +145,15 @@ def read_file_content(item_path, limit=None, chunk_size=4096):
     content = []
     truncated = False
 
-    with open(item_path, "r", encoding="utf-8", errors="replace") as file:
+    if content_hash is None:
+        file = opener(item_path, "r", encoding="utf-8", errors="replace")
+    else:
+        import io
+
+        raw = io.BufferedReader(content_hash.wrap(opener(item_path, "rb")))
+        file = io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+
+    with file:
         bytes_read = 0
         while not limit or bytes_read < limit:
             if limit:
@@ -125,16 +191,82 @@ def remove_comments(code, language):
     TypeScript, Java, C, C++, and others. If a language is not supported, the original code
     will be returned without any modifications.
     """
-    single_line_pattern = SINGLE_LINE_COMMENT_PATTERNS.get(language, "")
-    multi_line_pattern = MULTI_LINE_COMMENT_PATTERNS.get(language, "")
+    single_line_pattern = SINGLE_LINE_COMMENT_PATTERNS.get(language)
+    multi_line_pattern = MULTI_LINE_COMMENT_PATTERNS.get(language)
 
-    code = re.sub(single_line_pattern, "", code)
-    code = re.sub(multi_line_pattern, "", code, flags=re.DOTALL)
+    if single_line_pattern:
+        code = compile_pattern(single_line_pattern).sub("", code)
+    if multi_line_pattern:
+        code = compile_pattern(multi_line_pattern).sub("", code)
 
     return code
 
 
-def generate_output_for_file(item, item_path, depth, limit, strip_comments):
+def minify_content(content, language):
+    """
+    Remove whitespace that carries no meaning from the provided content.
+
+    Trailing whitespace is stripped, runs of blank lines are collapsed into one, and
+    whitespace between JSON tokens is removed, keeping the tokens exactly as written.
+    Indentation is removed for languages where it is
+    cosmetic (JSON, XML, HTML) and kept for all others, in particular for
+    indentation-sensitive languages like Python and YAML.
+
+    Args:
+    - content (str): The content to minify.
+    - language (str): The language of the content, as mapped from its file extension.
+
+    Returns:
+    - str: The minified content.
+    """
+    if language == "json":
+        import json
+        import re
+
+        try:
+            # Only validated, as re-serializing would rewrite numbers and duplicate keys
+            json.loads(content)
+        except ValueError:
+            pass  # Truncated or invalid JSON is minified line by line
+        else:
+            # Strings are matched whole, so the whitespace they contain is kept
+            return re.sub(r'("(?:[^"\\]|\\.)*")|[ \t\n\r]+', r"\1", content)
+
+    dedent = language in DEDENTABLE_LANGUAGES
+    lines = []
+    previous_blank = True  # Also drops leading blank lines
+
+    for line in content.splitlines():
+        line = line.strip() if dedent else line.rstrip()
+        if not line:
+            if previous_blank:
+                continue
+            previous_blank = True
+        else:
+            previous_blank = False
+        lines.append(line)
+
+    if lines and not lines[-1]:
+        lines.pop()
+
+    return "\n".join(lines)
+
+
+def generate_output_for_file(
+    item,
+    item_path,
+    depth,
+    limit,
+    strip_comments,
+    fs=None,
+    minify=False,
+    stats=None,
+    outline=None,
+    shared_headers=None,
+    notebook_outputs=False,
+    summarize_data=None,
+    content_hash=None,
+):
     """
     Generate the formatted output string for a given file.
 
@@ -144,6 +276,17 @@ def generate_output_for_file(item, item_path, depth, limit, strip_comments):
     - depth (int): Depth of the file in the directory structure.
     - limit (int, optional): Maximum characters to display from the file.
     - strip_comments (bool): Wether to strip comments from file contents.
+    - fs (object, optional): Filesystem backend to read from. Reads from disk by default.
+    - minify (bool, optional): Whether to remove meaningless whitespace from file contents.
+    - stats (dict, optional): Run statistics, updated in place.
+    - outline (str, optional): Outline Python files instead of displaying their content,
+                               either as "signatures" or with "docstrings".
+    - shared_headers (dict, optional): Headers shared across files, elided from the content.
+    - notebook_outputs (bool, optional): Whether to summarize the outputs of notebook cells
+                                         instead of dropping them.
+    - summarize_data (int, optional): Summarize large structured data files with their
+                                      schema and this many records.
+    - content_hash (ContentHash, optional): Manifest hash fed with the file as it is read.
 
     Returns:
     - str: Formatted output string for the file.
@@ -156,13 +299,69 @@ def generate_output_for_file(item, item_path, depth, limit, strip_comments):
     if is_binary_file(item):
         return f"{padding_left}-- {item} (binary file)\n"
 
-    content, truncated = read_file_content(item_path, limit)
+    if fs is None:
+        fs = LocalFileSystem()
 
     # Getting programming language from file extension
     language = FILE_EXTENSION_MAPPINGS.get(os.path.splitext(item)[1], "")
 
-    if strip_comments:
-        content = remove_comments(content, language)
+    if summarize_data and is_data_file(item):
+        size = fs.stat(item_path).st_size
+        # Small data files, such as configuration, are displayed as they are
+        if size > (limit or DATA_FILE_SUMMARY_MIN_SIZE):
+            from slimer.datafiles import summarize_data_file
+
+            extension = os.path.splitext(item)[1]
+            summary = summarize_data_file(item_path, extension, fs, summarize_data)
+            if summary is not None:
+                count_stat(stats, "data_files_summarized")
+                return f"{spacer} (summary of {size:,} bytes)\n```\n{summary}```\n"
+
+    if item.endswith(NOTEBOOK_FILE_EXTENSION):
+        from slimer.notebook import render_notebook
+
+        # Files that aren't valid notebooks fall back to their regular content
+        cells = render_notebook(item_path, fs, notebook_outputs, limit)
+        if cells is not None:
+            count_stat(stats, "notebooks_extracted")
+            return f"{spacer} (notebook)\n{cells}"
+
+    content = None
+    if outline and language == "python":
+        from slimer.outline import get_python_outline
+
+        # Files that don't parse fall back to their regular content
+        content = get_python_outline(item_path, fs, outline == "docstrings")
+        if content is not None:
+            count_stat(stats, "files_outlined")
+            spacer = f"{spacer} (outline)"
+            truncated = False
+
+    if content is None:
+        content, truncated = read_file_content(
+            item_path, limit, opener=fs.open, content_hash=content_hash
+        )
+        # Bytes rather than characters, like the sizes of passed through files
+        if stats is not None:
+            count_stat(stats, "bytes_read", len(content.encode("utf-8")))
+
+        if shared_headers:
+            from slimer.headers import strip_shared_header
+
+            content, number = strip_shared_header(content, shared_headers)
+            if number is not None:
+                count_stat(stats, "shared_headers_elided")
+                spacer = f"{spacer} (shared header {number} elided)"
+
+        if strip_comments:
+            content = remove_comments(content, language)
+
+    if minify:
+        minified = minify_content(content, language)
+        if stats is not None:
+            saved = len(content.encode("utf-8")) - len(minified.encode("utf-8"))
+            count_stat(stats, "minify_bytes_saved", saved)
+        content = minified
 
     if not content.strip():
         return f"{padding_left}-- {item} (empty file)\n"
@@ -176,9 +375,392 @@ def generate_output_for_file(item, item_path, depth, limit, strip_comments):
     )
 
 
-def display_files_in_directory(
+def is_plain_text_file(item_path, chunk_size=1024 * 1024):
+    """
+    Check if a file renders to exactly its own bytes when read as text.
+
+    The file is validated in chunks without building its content: it must be
+    valid UTF-8, contain no carriage returns (which text mode would translate),
+    and contain at least one non-whitespace character.
+
+    Args:
+    - item_path (str): Path to the file.
+    - chunk_size (int, optional): Size of each chunk to be validated.
+
+    Returns:
+    - bool: True if the file can be copied verbatim into the output.
+    """
+    import codecs
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    has_content = False
+
+    with open(item_path, "rb") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if b"\r" in chunk:
+                return False
+            try:
+                text = decoder.decode(chunk, final=not chunk)
+            except UnicodeDecodeError:
+                return False
+            if not has_content and text.strip():
+                has_content = True
+            if not chunk:
+                return has_content
+
+
+def generate_passthrough_for_file(item, item_path, depth, limit, content_hash=None):
+    """
+    Generate a section whose content is copied verbatim from the file, if possible.
+
+    Args:
+    - item (str): Name of the file.
+    - item_path (str): Absolute path of the file.
+    - depth (int): Depth of the file in the directory structure.
+    - limit (int, optional): Maximum characters to display from the file.
+    - content_hash (ContentHash, optional): Manifest hash fed with the file when it is copied.
+
+    Returns:
+    - FileContentSection: The section, or None if the file needs the regular text path.
+    """
+    size = os.stat(item_path).st_size
+    if limit and size > limit:
+        return None
+    if not is_plain_text_file(item_path):
+        return None
+
+    language = FILE_EXTENSION_MAPPINGS.get(os.path.splitext(item)[1], "")
+    header = f"{'  ' * depth}-- {item:<40}\n```{language}\n"
+    return FileContentSection(header, item_path, size, "\n```\n", content_hash)
+
+
+def get_entropy(data):
+    """Get the Shannon entropy of a byte string, in bits per byte."""
+    import math
+
+    total = len(data)
+    return -sum(
+        count / total * math.log2(count / total)
+        for count in (data.count(value) for value in set(data))
+    )
+
+
+GENERATED_SAMPLE_SIZE = 8192
+
+
+def is_generated_file(
+    item,
+    item_path,
+    fs,
+    sample_size=GENERATED_SAMPLE_SIZE,
+    marker_lines=10,
+    max_line_length=1000,
+    max_entropy=5.75,
+):
+    """
+    Check if a file is machine-generated, minified or a lock file.
+
+    Known names are matched first. Other files are classified from a sample of
+    their first bytes: a generation marker near the top, a very long line in a
+    code or data file, or a high entropy (as in embedded base64 or hashes) flags
+    them as generated.
+
+    Args:
+    - item (str): Name of the file.
+    - item_path (str): Path of the file.
+    - fs (object): Filesystem backend to read from.
+    - sample_size (int, optional): Number of bytes to sample from the start of the file.
+    - marker_lines (int, optional): Number of leading lines searched for generation markers.
+    - max_line_length (int, optional): Longest line expected in hand-written code or data.
+    - max_entropy (float, optional): Highest entropy expected in hand-written files.
+
+    Returns:
+    - bool: True if the file looks generated.
+    """
+    if should_exclude(item, GENERATED_FILE_PATTERNS):
+        return True
+
+    with fs.open(item_path, "rb") as file:
+        sample = file.read(sample_size)
+
+    lines = sample.splitlines()
+    header = b"\n".join(lines[:marker_lines]).decode("utf-8", "replace").lower()
+    if any(marker in header for marker in GENERATED_CONTENT_MARKERS):
+        return True
+
+    is_code = os.path.splitext(item)[1].lower() in LONG_LINE_FILE_EXTENSIONS
+    if is_code and any(len(line) > max_line_length for line in lines):
+        return True
+
+    # Short samples have a low entropy whatever their content
+    return len(sample) >= 1024 and get_entropy(sample) > max_entropy
+
+
+REGEX_METACHARACTERS = ".^$*+?{}[]()|\\"
+
+
+def get_required_literal(pattern):
+    """
+    Find the longest literal string that every match of a regular expression contains.
+
+    The analysis is conservative: alternations, groups, classes and escapes end a
+    literal run, and a character followed by an optional quantifier is dropped.
+
+    Args:
+    - pattern (str): The regular expression.
+
+    Returns:
+    - tuple: The required literal (or None), and whether the pattern is that literal.
+    """
+    if not any(char in REGEX_METACHARACTERS for char in pattern):
+        return pattern, True
+    if "|" in pattern or "(?" in pattern:
+        return None, False
+
+    runs = [""]
+    group_depth = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\" and index + 1 < len(pattern):
+            escaped = pattern[index + 1]
+            index += 2
+            if escaped.isalnum() or group_depth:
+                runs.append("")
+            else:
+                runs[-1] += escaped
+            continue
+        if char in "*?{":
+            runs[-1] = runs[-1][:-1]
+            runs.append("")
+            if char == "{":
+                closing = pattern.find("}", index)
+                index = len(pattern) if closing == -1 else closing
+        elif char == "[":
+            closing = pattern.find("]", index + 2)
+            index = len(pattern) if closing == -1 else closing
+            runs.append("")
+        elif char == "(":
+            group_depth += 1
+            runs.append("")
+        elif char == ")":
+            group_depth = max(0, group_depth - 1)
+        elif char in REGEX_METACHARACTERS or group_depth:
+            runs.append("")
+        else:
+            runs[-1] += char
+        index += 1
+
+    literal = max(runs, key=len)
+    return literal or None, False
+
+
+def file_matches(item_path, fs, pattern, chunk_size=1024 * 1024):
+    """
+    Check if the content of a file matches a regular expression.
+
+    The literal every match must contain is searched first, as bytes, and the
+    search stops at its first occurrence. Only files containing it are decoded
+    and searched with the full regular expression.
+
+    Args:
+    - item_path (str): Path to the file.
+    - fs (object): Filesystem backend to read from.
+    - pattern (str): The regular expression.
+    - chunk_size (int, optional): Size of each chunk to be searched.
+
+    Returns:
+    - bool: True if the file content matches the pattern.
+    """
+    literal, is_literal = get_required_literal(pattern)
+
+    if literal:
+        needle = literal.encode("utf-8")
+        overlap = len(needle) - 1
+        found = False
+        with fs.open(item_path, "rb") as file:
+            tail = b""
+            while not found:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                # Keep the end of the previous chunk to find matches across chunks
+                found = needle in tail + chunk
+                tail = chunk[-overlap:] if overlap else b""
+        if not found or is_literal:
+            return found
+
+    with fs.open(item_path, "r", encoding="utf-8", errors="replace") as file:
+        return compile_pattern(pattern).search(file.read()) is not None
+
+
+class DeferredSection:
+    """
+    A section whose text is only rendered when it is written out.
+
+    Used for sections that depend on work still running in the background, so
+    the walk can carry on while that work completes.
+    """
+
+    def __init__(self, render):
+        self.render = render
+
+    def __str__(self):
+        return self.render()
+
+
+def count_file_lines(item_path, fs, chunk_size=1024 * 1024):
+    """Count the newlines of a file through buffered binary reads."""
+    lines = 0
+    with fs.open(item_path, "rb") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return lines
+            lines += chunk.count(b"\n")
+
+
+def new_totals():
+    """Create the aggregated totals of a directory for sized trees."""
+    return {"files": 0, "bytes": 0, "lines": []}
+
+
+def add_totals(totals, other):
+    """Add the totals of a subdirectory to the totals of its parent."""
+    totals["files"] += other["files"]
+    totals["bytes"] += other["bytes"]
+    totals["lines"].extend(other["lines"])
+
+
+def format_totals(totals, count_lines, count_files=True):
+    """Format directory totals, waiting for pending line counts if needed."""
+    parts = [f"{totals['files']:,} files"] if count_files else []
+    if count_lines:
+        lines = sum(future.result() for future in totals["lines"])
+        parts.append(f"{lines:,} lines")
+    parts.append(f"{totals['bytes']:,} bytes")
+    return ", ".join(parts)
+
+
+def format_count(count):
+    """Format a count compactly, e.g. 391234 -> 391k."""
+    if count >= 1_000_000:
+        return f"{count / 1_000_000:.0f}M"
+    if count >= 1_000:
+        return f"{count / 1_000:.0f}k"
+    return str(count)
+
+
+def get_entry_category(entry):
+    """Get the category a directory entry is summarized under when collapsed."""
+    if entry.is_dir():
+        return "dirs"
+    ext = os.path.splitext(entry.name)[1]
+    return f"*{ext}" if ext else "no extension"
+
+
+def list_directory(fs, directory, exclusion_patterns, max_entries=None):
+    """
+    List the entries of a directory in sorted order, skipping excluded names.
+
+    When `max_entries` is set, the directory is consumed in a single streaming
+    pass that only keeps the first `max_entries` names in memory, and the other
+    entries are summarized by category, so memory doesn't grow with directory size.
+
+    Args:
+    - fs (object): Filesystem backend to list the directory with.
+    - directory (str): Path to the directory to list.
+    - exclusion_patterns (set): Patterns used to exclude filenames or directory names.
+    - max_entries (int, optional): Maximum number of entries to return.
+
+    Returns:
+    - tuple: The sorted entries, and the number of entries left out per category.
+    """
+    entries = (
+        entry
+        for entry in fs.scandir(directory)
+        if not should_exclude(entry.name, exclusion_patterns)
+    )
+    if max_entries is None:
+        return sorted(entries, key=lambda entry: entry.name), {}
+
+    import heapq
+
+    hidden = {}
+
+    def count_categories(entries):
+        for entry in entries:
+            category = get_entry_category(entry)
+            hidden[category] = hidden.get(category, 0) + 1
+            yield entry
+
+    kept = heapq.nsmallest(
+        max_entries, count_categories(entries), key=lambda entry: entry.name
+    )
+    for entry in kept:
+        hidden[get_entry_category(entry)] -= 1
+
+    return kept, {category: count for category, count in hidden.items() if count}
+
+
+def format_hidden_entries(hidden, depth, max_categories=5):
+    """
+    Format the summary line of the entries left out of a collapsed directory.
+
+    Args:
+    - hidden (dict): Number of entries left out per category.
+    - depth (int): Depth of the directory's entries in the directory structure.
+    - max_categories (int, optional): Maximum number of categories to detail.
+
+    Returns:
+    - str: Summary line, e.g. "-- ... 398,112 more entries (*.json: 391k, *.bin: 7k)".
+    """
+    categories = sorted(hidden.items(), key=lambda item: (-item[1], item[0]))
+    details = ", ".join(
+        f"{category}: {format_count(count)}"
+        for category, count in categories[:max_categories]
+    )
+    return f"{'  ' * depth}-- ... {sum(hidden.values()):,} more entries ({details})\n"
+
+
+def count_stat(stats, key, amount=1):
+    """Increment a run statistic, if statistics are being collected."""
+    if stats is not None:
+        stats[key] = stats.get(key, 0) + amount
+
+
+def get_file_identity(entry, device):
+    """
+    Get the (st_dev, st_ino) pair identifying the file behind a directory entry.
+
+    Regular files use the inode reported by the directory listing and the device
+    of their parent, which avoids a stat call per file. Directories and symlinks
+    are stat'ed, since they may lead to another device or back into the tree.
+
+    Args:
+    - entry (DirEntry): The directory entry.
+    - device (int): Device of the directory containing the entry.
+
+    Returns:
+    - tuple: The identity of the file, or None if the backend has no inodes.
+    """
+    if entry.is_symlink() or entry.is_dir():
+        stat = entry.stat()
+        identity = (stat.st_dev, stat.st_ino)
+    else:
+        identity = (device, entry.inode())
+    return identity if identity[1] else None
+
+
+# Parameters of the walker tracking the state of a walk, rather than its options
+WALK_STATE = ("directory", "depth", "visited", "device", "totals", "line_counter")
+
+
+def iter_files_in_directory(
     directory,
     depth=0,
+    *,
     limit=None,
     depth_limit=None,
     exclusion_patterns=None,
@@ -187,9 +769,37 @@ def display_files_in_directory(
     recent_minutes=None,
     file_extensions=None,
     strip_comments=False,
+    fs=None,
+    follow_symlinks=True,
+    stats=None,
+    max_entries_per_dir=None,
+    passthrough=False,
+    minify=False,
+    outline=None,
+    skip_generated=False,
+    show_sizes=False,
+    count_lines=False,
+    grep=None,
+    shared_headers=None,
+    notebook_outputs=False,
+    summarize_data=None,
+    manifest=None,
+    snapshot=None,
+    visited=None,
+    device=None,
+    totals=None,
+    line_counter=None,
 ):
     """
-    Display the directory structure and file content recursively.
+    Generate the directory structure and file content recursively, one section at a time.
+
+    Sections are yielded as soon as they are rendered, so that consumers can stream
+    them to their destination without holding the whole output in memory.
+
+    Every directory and file is visited at most once, based on its device and inode,
+    so symlink loops terminate and hardlinked or bind-mounted copies are read once.
+
+    Options are keyword-only, and are passed down by name to the walks of subdirectories.
 
     Args:
     - directory (str): Path to the directory to display.
@@ -202,58 +812,248 @@ def display_files_in_directory(
     - recent_minutes (int, optional): Only display files modified within the last N minutes.
     - file_extensions (list, optional): List of file extensions to exclusively display.
     - strip_comments (bool, optional): Wether to strip comments from file contents.
-
-    Returns:
-    - str: Formatted string of the directory structure and file content.
+    - fs (object, optional): Filesystem backend to walk. Walks the local disk by default.
+    - follow_symlinks (bool, optional): If False, symlinked files and directories are skipped.
+    - stats (dict, optional): Run statistics, updated in place.
+    - max_entries_per_dir (int, optional): Maximum number of entries to display per
+                                           directory. Other entries are summarized.
+    - passthrough (bool, optional): If True, files that need no transformation are
+                                    yielded as `FileContentSection`s, which file sinks
+                                    copy without decoding.
+    - minify (bool, optional): Whether to remove meaningless whitespace from file contents.
+    - outline (str, optional): Outline Python files instead of displaying their content,
+                               either as "signatures" or with "docstrings".
+    - skip_generated (bool, optional): If True, generated, minified and lock files are
+                                       replaced by a placeholder with their size.
+    - show_sizes (bool, optional): In tree mode, annotate files with their size and
+                                   directories with their total size and file count.
+    - count_lines (bool, optional): In tree mode, also annotate files and directories
+                                    with their line counts, counted in a thread pool.
+    - grep (str, optional): Only display files whose content matches this regular expression.
+    - shared_headers (dict, optional): Headers shared across files, as found by
+                                       `find_shared_headers`, elided from file contents.
+    - notebook_outputs (bool, optional): Whether to summarize the outputs of notebook
+                                         cells instead of dropping them.
+    - summarize_data (int, optional): Summarize large structured data files with their
+                                      schema and this many records.
+    - manifest (Manifest, optional): Manifest recording every file displayed.
+    - snapshot (Snapshot, optional): Snapshot of a previous run. Files unchanged since
+                                     are skipped, and the others are recorded.
+    - visited (set, optional): Identities of the files visited so far. Used internally.
+    - device (int, optional): Device of `directory`. Used internally.
+    - totals (dict, optional): Totals of `directory` in sized trees. Used internally.
+    - line_counter (Executor, optional): Pool counting lines. Used internally.
+
+    Yields:
+    - str: Formatted sections of the directory structure and file content.
     """
     if exclusion_patterns is None:
         exclusion_patterns = []
 
+    if fs is None:
+        fs = LocalFileSystem()
+
+    options = dict(locals())
+    for name in WALK_STATE:
+        del options[name]
+
+    if count_lines and line_counter is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor() as line_counter:
+            yield from iter_files_in_directory(
+                directory,
+                depth,
+                visited=visited,
+                device=device,
+                totals=totals,
+                line_counter=line_counter,
+                **options,
+            )
+        return
+
+    show_sizes = tree_only and (show_sizes or count_lines)
+    if totals is None:
+        totals = new_totals()
+
+    if visited is None:
+        root_stat = fs.stat(directory)
+        device = root_stat.st_dev
+        visited = {(root_stat.st_dev, root_stat.st_ino)}
+
     if depth_limit is not None and depth >= depth_limit:
-        return ""
+        return
 
-    output = ""
+    count_stat(stats, "directories")
+    if stats is not None:
+        stats["current_path"] = directory
 
-    for item in os.listdir(directory):
-        if should_exclude(item, exclusion_patterns):
-            continue
+    # Sorting keeps the output stable across filesystems and archive layouts
+    entries, hidden = list_directory(
+        fs, directory, exclusion_patterns, max_entries_per_dir
+    )
+
+    for entry in entries:
+        item = entry.name
+        item_path = entry.path
 
-        item_path = os.path.join(directory, item)
+        if not follow_symlinks and entry.is_symlink():
+            count_stat(stats, "symlinks_skipped")
+            continue
 
         # If the recent_minutes argument is used, check the file modification time.
         if recent_minutes is not None:
-            file_mod_time = os.path.getmtime(item_path)
+            import time
+
+            file_mod_time = entry.stat().st_mtime
             current_time = time.time()
             seconds_in_a_minute = 60
             if current_time - file_mod_time > recent_minutes * seconds_in_a_minute:
                 continue  # Skip this file if it wasn't modified within the recent_minutes timeframe
 
-        if os.path.isdir(item_path):
-            output += f"{'  ' * depth}/{item}:\n"
-            output += display_files_in_directory(
+        identity = get_file_identity(entry, device)
+        if identity in visited:
+            count_stat(stats, "duplicates_skipped")
+            continue
+        if identity is not None:
+            visited.add(identity)
+
+        is_dir = entry.is_dir()
+        # Rendered files are only searched once the cheaper name filters below kept them
+        if grep is not None and tree_only and not is_dir:
+            if is_binary_file(item) or not file_matches(item_path, fs, grep):
+                count_stat(stats, "files_not_matching")
+                continue
+
+        if is_dir:
+            subtotals = new_totals()
+            subdirectory = iter_files_in_directory(
                 item_path,
                 depth + 1,
-                limit,
-                depth_limit,
-                exclusion_patterns,
-                tree_only,
-                include_binary,
-                recent_minutes,
-                file_extensions,
-                strip_comments,
+                visited=visited,
+                device=identity[0] if identity else device,
+                totals=subtotals,
+                line_counter=line_counter,
+                **options,
+            )
+
+            if not show_sizes:
+                yield f"{'  ' * depth}/{item}:\n"
+                yield from subdirectory
+                continue
+
+            # The header needs the totals of the whole subtree, which is small in tree mode
+            children = list(subdirectory)
+            add_totals(totals, subtotals)
+            header = f"{'  ' * depth}/{item}: "
+            yield DeferredSection(
+                lambda header=header, subtotals=subtotals: (
+                    f"{header}({format_totals(subtotals, count_lines)})\n"
+                )
+            )
+            yield from children
+        elif show_sizes:
+            count_stat(stats, "files")
+            if manifest is not None:
+                manifest.add(item_path, fs, hash_content=False)
+            size = entry.stat().st_size
+            file_totals = {"files": 1, "bytes": size, "lines": []}
+            if count_lines:
+                file_totals["lines"].append(
+                    line_counter.submit(count_file_lines, item_path, fs)
+                )
+            add_totals(totals, file_totals)
+            line = f"{'  ' * depth}-- {item:<40} "
+            yield DeferredSection(
+                lambda line=line, file_totals=file_totals: (
+                    f"{line}({format_totals(file_totals, count_lines, False)})\n"
+                )
             )
         elif tree_only:
-            output += f"{'  ' * depth}-- {item:<40}\n"
+            count_stat(stats, "files")
+            if manifest is not None:
+                manifest.add(item_path, fs, hash_content=False)
+            yield f"{'  ' * depth}-- {item:<40}\n"
         else:
             if file_extensions and os.path.splitext(item)[1] not in file_extensions:
                 continue
             if not include_binary and is_binary_file(item):
                 continue
-            output += generate_output_for_file(
-                item, item_path, depth, limit, strip_comments
+            if grep is not None:
+                if is_binary_file(item) or not file_matches(item_path, fs, grep):
+                    count_stat(stats, "files_not_matching")
+                    continue
+            count_stat(stats, "files")
+            # Fed by the rendering below, so displayed files are only read once
+            content_hash = None
+            if manifest is not None:
+                content_hash = manifest.add(item_path, fs)
+
+            # Files unchanged since the snapshot have nothing to display
+            if snapshot is not None and snapshot.reuse(item_path, entry.stat()):
+                continue
+
+            # Only untransformed files on the local disk can be copied verbatim
+            can_pass_through = passthrough and isinstance(fs, LocalFileSystem)
+            is_transformed = strip_comments or minify or outline or shared_headers
+            is_notebook = item.endswith(NOTEBOOK_FILE_EXTENSION)
+            is_summarized = summarize_data and is_data_file(item)
+            is_verbatim = not (is_transformed or is_notebook or is_summarized)
+            # Notebooks and data dumps look generated, but are extracted or summarized instead
+            check_generated = skip_generated and not (
+                is_binary_file(item) or is_notebook or is_summarized
             )
 
-    return output
+            section = None
+            if check_generated and is_generated_file(item, item_path, fs):
+                count_stat(stats, "generated_files_skipped")
+                size = fs.stat(item_path).st_size
+                section = f"{'  ' * depth}-- {item} (generated file, {size:,} bytes)\n"
+            elif can_pass_through and is_verbatim and not is_binary_file(item):
+                section = generate_passthrough_for_file(
+                    item, item_path, depth, limit, content_hash
+                )
+                if section is not None:
+                    count_stat(stats, "bytes_read", section.size)
+
+            if section is None:
+                section = generate_output_for_file(
+                    item,
+                    item_path,
+                    depth,
+                    limit,
+                    strip_comments,
+                    fs,
+                    minify,
+                    stats,
+                    outline,
+                    shared_headers,
+                    notebook_outputs,
+                    summarize_data,
+                    content_hash,
+                )
+
+            if snapshot is not None:
+                snapshot.record(item_path, entry.stat(), section)
+            yield section
+
+    if hidden:
+        count_stat(stats, "entries_collapsed", sum(hidden.values()))
+        yield format_hidden_entries(hidden, depth)
+
+
+def display_files_in_directory(directory, *args, **kwargs):
+    """
+    Display the directory structure and file content recursively.
+
+    Args:
+    - directory (str): Path to the directory to display.
+    - *args, **kwargs: Options accepted by `iter_files_in_directory`.
+
+    Returns:
+    - str: Formatted string of the directory structure and file content.
+    """
+    return "".join(map(str, iter_files_in_directory(directory, *args, **kwargs)))
 
 
 def get_exclusion_patterns(args):
@@ -271,17 +1071,46 @@ def get_exclusion_patterns(args):
     return exclusions - inclusions
 
 
-def parse_arguments():
+SIZE_SUFFIXES = {"k": 1024, "m": 1024**2, "g": 1024**3}
+
+
+def parse_size(value):
+    """
+    Parse a size from the command line, with an optional K, M or G suffix.
+
+    Args:
+    - value (str): The size, e.g. "4096" or "64M".
+
+    Returns:
+    - int: The size in units.
+    """
+    multiplier = SIZE_SUFFIXES.get(value[-1:].lower(), 1)
+    if multiplier > 1:
+        value = value[:-1]
+    if not value.isdigit():
+        raise ValueError(f"invalid size: {value}")
+    return int(value) * multiplier
+
+
+def parse_arguments(argv=None):
     """
     Parse command line arguments using argparse.
 
+    Args:
+    - argv (list, optional): Arguments to parse. Defaults to the process arguments.
+
     Returns:
     - Namespace: Namespace object containing parsed arguments.
     """
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Display folder structure and file content."
     )
-    parser.add_argument("path", help="Path to the directory you want to display.")
+    parser.add_argument(
+        "path",
+        help="Path to the directory you want to display, or to a zip or tar archive.",
+    )
     parser.add_argument(
         "-c", "--copy", action="store_true", help="Copy the output to the clipboard."
     )
@@ -343,7 +1172,38 @@ def parse_arguments():
         "--output",
         type=str,
         default=None,
-        help="Path to a file where the output will be written. If not provided, prints to console.",
+        help="Path to a file where the output will be written. If not provided, prints to console. Files ending in .gz or .xz are compressed.",
+    )
+    parser.add_argument(
+        "--stdout",
+        action="store_true",
+        help="Also print the output to the console when it is written to a file or copied, from the same render.",
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        choices=range(10),
+        metavar="{0-9}",
+        default=None,
+        help="Compression level for .gz and .xz output files. Uses the format default when not provided.",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=None,
+        help="Split the output file into numbered shards (out.001.md, out.002.md, ...) of at most this size. Requires --output.",
+    )
+    parser.add_argument(
+        "--shard-unit",
+        choices=["chars", "tokens"],
+        default="chars",
+        help="Unit of --shard-size. Tokens are estimated from the number of characters.",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=parse_size,
+        default=None,
+        help="Fail rather than hold more than this much output in memory, in characters, optionally with a K, M or G suffix (e.g. 64M). Only --copy without a clipboard helper needs the whole output in memory; every other destination streams it.",
     )
     parser.add_argument(
         "-r",
@@ -369,45 +1229,376 @@ def parse_arguments():
         help="Strip comments from the code in the output.",
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Strip trailing whitespace, collapse blank lines and compact JSON, XML and HTML. Indentation of Python, YAML and Markdown is kept.",
+    )
+    parser.add_argument(
+        "--outline",
+        nargs="?",
+        const="signatures",
+        choices=["signatures", "docstrings"],
+        default=None,
+        help="Only display imports, class and function signatures of Python files. Use 'docstrings' to keep the first line of docstrings.",
+    )
+    parser.add_argument(
+        "--skip-generated",
+        action="store_true",
+        help="Replace generated, minified and lock files with a placeholder showing their size.",
+    )
+    parser.add_argument(
+        "--sizes",
+        action="store_true",
+        help="With --tree, annotate files with their size and directories with their total size and file count.",
+    )
+    parser.add_argument(
+        "--lines",
+        action="store_true",
+        help="With --tree, also annotate files and directories with their line counts.",
+    )
+    parser.add_argument(
+        "--grep",
+        type=str,
+        default=None,
+        help="Only display files whose content matches this regular expression.",
+    )
+    parser.add_argument(
+        "--summarize-data",
+        type=int,
+        nargs="?",
+        const=5,
+        default=None,
+        metavar="K",
+        help="Summarize large .json, .jsonl, .csv, .tsv, .yaml and .sql files with their schema, record counts and first K records (5 by default).",
+    )
+    parser.add_argument(
+        "--notebook-outputs",
+        action="store_true",
+        help="Summarize the outputs of Jupyter notebook cells in a line each, instead of dropping them.",
+    )
+    parser.add_argument(
+        "--dedupe-headers",
+        action="store_true",
+        help="Display leading blocks repeated across files, such as license banners, once at the top and elide them from each file.",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Write a JSON manifest of the files displayed, with their size, mtime and blake2b content hash (none with --tree), to PATH.",
+    )
+    parser.add_argument(
+        "--since-snapshot",
+        type=str,
+        default=None,
+        metavar="PREV",
+        help="Only display the files added, modified or removed since the snapshot at PREV, with diffs, and update it. Created on first use.",
+    )
+    parser.add_argument(
+        "--files-from",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Display the files listed in FILE, or stdin for -, instead of walking the path. Paths are separated by NUL bytes or newlines.",
+    )
+    parser.add_argument(
+        "--index",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Keep file metadata in a SQLite database at PATH, so later runs only list changed directories.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="List directories ahead of the output in this many parallel workers. Speeds up network filesystems.",
+    )
+    parser.add_argument(
+        "--follow-symlinks",
+        choices=["always", "never"],
+        default="always",
+        help="Whether to follow symlinked files and directories. Each file is visited at most once either way.",
+    )
+    parser.add_argument(
+        "--max-entries-per-dir",
+        type=int,
+        default=None,
+        help="Maximum number of entries to display per directory. The rest are summarized by extension.",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Display live progress on stderr, when it is a terminal.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print statistics about the run to stderr.",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.shard_size is not None and not args.output:
+        parser.error("--shard-size requires --output")
+    if (args.sizes or args.lines) and not args.tree:
+        parser.error("--sizes and --lines require --tree")
+    if args.since_snapshot and args.tree:
+        parser.error(
+            "--since-snapshot displays file contents, so can't be used with --tree"
+        )
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    return args
 
 
-def get_directory_output(args, absolute_path):
+def open_index(args, absolute_path):
     """
-    Get the formatted directory structure and content based on provided arguments.
+    Open the persistent metadata index, with the filters known upfront applied by its queries.
 
     Args:
     - args (Namespace): Parsed arguments from argparse.
     - absolute_path (str): Absolute path of the directory to display.
 
     Returns:
-    - str: Formatted string of the directory structure and content.
+    - IndexedFileSystem: The filesystem backend serving listings from the index.
     """
-    exclusion_patterns = get_exclusion_patterns(args)
+    from slimer.index import IndexedFileSystem
 
-    output_parts = []
+    modified_since = None
+    if args.recent is not None:
+        import time
 
-    if args.prepend:
-        output_parts.append(args.prepend)
-
-    output_parts.append(
-        display_files_in_directory(
-            absolute_path,
-            limit=args.limit,
-            depth_limit=args.depth,
-            exclusion_patterns=exclusion_patterns,
-            tree_only=args.tree,
-            include_binary=args.binary,
-            recent_minutes=args.recent,
-            file_extensions=args.file_extensions,
-            strip_comments=args.strip_comments,
-        )
+        modified_since = time.time() - args.recent * 60
+
+    # Extension and binary filters only apply to file contents, not to the tree
+    return IndexedFileSystem(
+        args.index,
+        modified_since=modified_since,
+        file_extensions=None if args.tree else args.file_extensions,
+        include_binary=args.tree or args.binary,
     )
 
+
+def get_archive_read_limit(args, exclusion_patterns):
+    """
+    Get how much of each archive member a run will read, so the rest is never spooled.
+
+    Args:
+    - args (Namespace): Parsed arguments from argparse.
+    - exclusion_patterns (set): Patterns used to exclude filenames or directory names.
+
+    Returns:
+    - callable: Function of the path of a member, returning the number of its leading
+                bytes that may be read, 0 for none, or None for all of them.
+    """
+    # These read files in full, whatever the limit
+    reads_whole_files = args.grep or args.manifest or args.dedupe_headers
+    # Tree listings don't hash the files of the manifest
+    tree_reads_whole_files = args.grep or args.dedupe_headers
+
+    def read_limit(path):
+        parts = path.split("/")
+        if any(should_exclude(part, exclusion_patterns) for part in parts):
+            return 0
+        if args.depth is not None and len(parts) > args.depth:
+            return 0
+        if args.tree:
+            return None if tree_reads_whole_files or args.lines else 0
+
+        item = parts[-1]
+        extension = os.path.splitext(item)[1]
+        if args.file_extensions and extension not in args.file_extensions:
+            return 0
+        if not args.binary and is_binary_file(item):
+            return 0
+        is_parsed = item.endswith(NOTEBOOK_FILE_EXTENSION) or (
+            args.summarize_data and is_data_file(item)
+        )
+        if reads_whole_files or is_parsed or args.outline or not args.limit:
+            return None
+
+        # Limits count encoded bytes of decoded characters, which take up to 4 bytes,
+        # and one more character is read to tell if the file was truncated
+        limit = 4 * (args.limit + 1)
+        return max(limit, GENERATED_SAMPLE_SIZE) if args.skip_generated else limit
+
+    return read_limit
+
+
+# Options changing how files are rendered, which invalidate the sections of a snapshot
+RENDER_OPTIONS = [
+    "limit",
+    "binary",
+    "strip_comments",
+    "minify",
+    "outline",
+    "skip_generated",
+    "dedupe_headers",
+    "notebook_outputs",
+    "summarize_data",
+]
+
+
+def iter_directory_output(
+    args,
+    absolute_path,
+    fs=None,
+    stats=None,
+    passthrough=False,
+    deferred_writes=None,
+):
+    """
+    Generate the formatted directory structure and content based on provided arguments.
+
+    Args:
+    - args (Namespace): Parsed arguments from argparse.
+    - absolute_path (str): Absolute path of the directory or archive to display.
+    - fs (object, optional): Filesystem backend to walk `absolute_path` with.
+                             Picked from the type of path when not provided.
+    - stats (dict, optional): Run statistics, updated in place.
+    - passthrough (bool, optional): If True, untransformed files are yielded as
+                                    `FileContentSection`s rather than strings.
+    - deferred_writes (list, optional): If provided, writes that must only happen once
+                                        the output has been delivered, such as the new
+                                        snapshot, are appended to it as callables rather
+                                        than done when the sections are exhausted.
+
+    Yields:
+    - str: Formatted sections of the directory structure and content.
+    """
+    exclusion_patterns = get_exclusion_patterns(args)
+
+    if args.prepend:
+        yield args.prepend
+        yield "\n"
+
+    if fs is None and args.files_from:
+        fs = open_file_list(args.files_from, absolute_path)
+    elif fs is None and not is_archive(absolute_path):
+        if args.index:
+            fs = open_index(args, absolute_path)
+        elif args.workers:
+            modified_since = None
+            if args.recent is not None:
+                import time
+
+                modified_since = time.time() - args.recent * 60
+
+            fs = ParallelFileSystem(
+                args.workers,
+                exclude=lambda name: should_exclude(name, exclusion_patterns),
+                depth_limit=args.depth,
+                stat_files=args.recent is not None or args.sizes or args.lines,
+                max_entries=args.max_entries_per_dir,
+                modified_since=modified_since,
+            )
+
+    if fs is None:
+        read_limit = get_archive_read_limit(args, exclusion_patterns)
+        fs, root = open_filesystem(absolute_path, read_limit)
+    else:
+        root = absolute_path
+
+    with fs:
+        shared_headers = None
+        # Deltas display no shared headers for elided files to refer to
+        if args.dedupe_headers and not (args.tree or args.since_snapshot):
+            from slimer.headers import (
+                find_shared_headers,
+                format_shared_header,
+                iter_header_candidates,
+            )
+
+            candidates = iter_header_candidates(
+                fs, root, exclusion_patterns, args.depth, args.file_extensions
+            )
+            shared_headers = find_shared_headers(fs, candidates)
+            for block, (number, file_count) in shared_headers.items():
+                yield format_shared_header(block, number, file_count)
+            if shared_headers:
+                yield "\n"
+
+        manifest = None
+        if args.manifest:
+            from slimer.manifest import Manifest
+
+            manifest = Manifest(root)
+
+        snapshot = None
+        if args.since_snapshot:
+            from slimer.snapshot import Snapshot
+
+            options = {option: getattr(args, option) for option in RENDER_OPTIONS}
+            snapshot = Snapshot(args.since_snapshot, root, options)
+
+        try:
+            sections = iter_files_in_directory(
+                root,
+                limit=args.limit,
+                depth_limit=args.depth,
+                exclusion_patterns=exclusion_patterns,
+                tree_only=args.tree,
+                include_binary=args.binary,
+                recent_minutes=args.recent,
+                file_extensions=args.file_extensions,
+                strip_comments=args.strip_comments,
+                fs=fs,
+                follow_symlinks=args.follow_symlinks == "always",
+                stats=stats,
+                max_entries_per_dir=args.max_entries_per_dir,
+                passthrough=passthrough and snapshot is None,
+                minify=args.minify,
+                outline=args.outline,
+                skip_generated=args.skip_generated,
+                show_sizes=args.sizes,
+                count_lines=args.lines,
+                grep=args.grep,
+                shared_headers=shared_headers,
+                notebook_outputs=args.notebook_outputs,
+                summarize_data=args.summarize_data,
+                manifest=manifest,
+                snapshot=snapshot,
+            )
+            if snapshot is None:
+                yield from sections
+            else:
+                # Only the changes are displayed, once every file has been checked
+                for _ in sections:
+                    pass
+                yield from snapshot.iter_changes()
+                if deferred_writes is None:
+                    snapshot.write()
+                else:
+                    deferred_writes.append(snapshot.write)
+            if manifest is not None:
+                manifest.write(args.manifest)
+        finally:
+            if manifest is not None:
+                manifest.close()
+
     if args.append:
-        output_parts.append(args.append)
+        yield "\n"
+        yield args.append
+
+
+def get_directory_output(args, absolute_path, fs=None):
+    """
+    Get the formatted directory structure and content based on provided arguments.
 
-    return "\n".join(output_parts)
+    Args:
+    - args (Namespace): Parsed arguments from argparse.
+    - absolute_path (str): Absolute path of the directory or archive to display.
+    - fs (object, optional): Filesystem backend to walk `absolute_path` with.
+                             Picked from the type of path when not provided.
+
+    Returns:
+    - str: Formatted string of the directory structure and content.
+    """
+    return "".join(map(str, iter_directory_output(args, absolute_path, fs)))
 
 
 def handle_arguments():
@@ -427,46 +1618,140 @@ def handle_arguments():
     return args, absolute_path
 
 
-def process_directory(args, absolute_path):
+def process_directory(args, absolute_path, stats=None, deferred_writes=None):
     """
     Processes the directory based on provided arguments.
 
     Args:
     - args (Namespace): Parsed arguments from argparse.
     - absolute_path (str): Absolute path of the directory to display.
+    - stats (dict, optional): Run statistics, updated in place as the output is rendered.
+    - deferred_writes (list, optional): Receives the writes to do once the output has
+                                        been delivered, as callables.
 
     Returns:
-    - str: Formatted string of the directory structure and content.
+    - iterator: Formatted sections of the directory structure and content, rendered lazily.
     """
-    return get_directory_output(args, absolute_path)
+    # Untransformed files are only worth passing through when the sole sink copies
+    # them without decoding, as any other sink reads them a second time
+    sole_sink = not (args.copy or args.stdout)
+    passthrough = sole_sink and copies_raw_bytes(args.output, args.shard_size)
+    return iter_directory_output(
+        args,
+        absolute_path,
+        stats=stats,
+        passthrough=passthrough,
+        deferred_writes=deferred_writes,
+    )
 
 
-def handle_output(output, copy_to_clipboard, output_file=None):
+def handle_output(
+    output,
+    copy_to_clipboard,
+    output_file=None,
+    compression_level=None,
+    shard_size=None,
+    shard_unit="chars",
+    max_memory=None,
+    print_output=False,
+):
     """
-    Handles the output, either by printing it, copying it to clipboard, or writing to an output file.
+    Handles the output, by printing it, copying it to clipboard, writing to an output file, or several of these.
 
     Args:
-    - output (str): The string to be output.
+    - output (str or iterable): The string to be output, or an iterable of sections
+                                that are streamed to the destination as they are produced.
     - copy_to_clipboard (bool): Whether to copy the output to clipboard.
     - output_file (str): Path to the file where the output will be written.
+                         Files ending in `.gz` or `.xz` are compressed.
+    - compression_level (int, optional): Compression level for compressed output files.
+    - shard_size (int, optional): Split the output file into numbered shards of at most this size.
+    - shard_unit (str, optional): Unit of `shard_size`, either "chars" or "tokens".
+    - max_memory (int, optional): Characters of output a destination that needs the
+                                  whole output at once may hold in memory before failing.
+    - print_output (bool, optional): Whether to also print the output when it is copied
+                                     or written to a file.
     """
-    if output_file:
-        with open(output_file, "w", encoding="utf-8") as file:
-            file.write(output)
-    elif copy_to_clipboard:
-        pyperclip.copy(output)
-    else:
-        print(output)
+    if isinstance(output, str):
+        output = [output]
+
+    with open_sink(
+        copy_to_clipboard,
+        output_file,
+        compression_level,
+        shard_size,
+        shard_unit,
+        max_memory,
+        print_output,
+    ) as sink:
+        for section in output:
+            sink.write(section)
+
+
+STAT_LABELS = {
+    "directories": "Directories visited",
+    "files": "Files displayed",
+    "duplicates_skipped": "Duplicates skipped",
+    "symlinks_skipped": "Symlinks skipped",
+    "entries_collapsed": "Entries collapsed",
+    "minify_bytes_saved": "Bytes saved by minify",
+    "files_outlined": "Files outlined",
+    "generated_files_skipped": "Generated files skipped",
+    "files_not_matching": "Files not matching --grep",
+    "bytes_read": "Bytes read",
+    "shared_headers_elided": "Shared headers elided",
+    "notebooks_extracted": "Notebooks extracted",
+    "data_files_summarized": "Data files summarized",
+}
+
+
+def report_stats(stats):
+    """
+    Print run statistics to stderr, so they never mix with the output itself.
+
+    Args:
+    - stats (dict): Run statistics collected while rendering.
+    """
+    print("Stats:", file=sys.stderr)
+    for key, label in STAT_LABELS.items():
+        if key in stats:
+            print(f"  {label}: {stats[key]:,}", file=sys.stderr)
 
 
 def main():
     """
     Main function to execute the program.
     """
+    if sys.argv[1:2] == ["serve"]:
+        from slimer.server import serve
+
+        serve(sys.argv[2:])
+        return
+
     try:
         args, absolute_path = handle_arguments()
-        output = process_directory(args, absolute_path)
-        handle_output(output, args.copy, args.output)
+        stats = {} if args.stats or args.progress else None
+        deferred_writes = []
+        output = process_directory(args, absolute_path, stats, deferred_writes)
+        if args.progress and sys.stderr.isatty():
+            from slimer.progress import ProgressReporter
+
+            output = ProgressReporter(stats).track(output)
+        handle_output(
+            output,
+            args.copy,
+            args.output,
+            args.compression_level,
+            args.shard_size,
+            args.shard_unit,
+            args.max_memory,
+            args.stdout,
+        )
+        # A snapshot only moves forward once the changes it hides were delivered
+        for write in deferred_writes:
+            write()
+        if args.stats:
+            report_stats(stats)
     except Exception as e:
         print(f"An unexpected error occurred: {str(e)}")
 
@@ -0,0 +1,187 @@
+"""
+Content manifests of rendered trees.
+
+A manifest lists every file emitted by a run with its size, mtime and a blake2b
+hash of its content, so that downstream jobs can tell which files changed
+between two runs without diffing the rendered outputs. The hash is fed with the
+raw bytes the renderer reads to display a file, so files displayed whole are
+read once. Files the renderer doesn't read to the end, such as files truncated
+by the limit, are hashed again when the manifest is written, in a thread pool
+when they are on the local disk. Tree listings read no content and list files
+without a hash.
+"""
+
+import hashlib
+import io
+import json
+import os
+
+from slimer.filesystem import LocalFileSystem
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path, opener=open, chunk_size=HASH_CHUNK_SIZE):
+    """
+    Hash the content of a file with blake2b.
+
+    Args:
+    - path (str): Path to the file.
+    - opener (callable, optional): Function used to open the file, with the signature of `open`.
+    - chunk_size (int, optional): Number of bytes hashed at a time.
+
+    Returns:
+    - str: The hexadecimal digest.
+    """
+    digest = hashlib.blake2b()
+    with opener(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashingReader(io.RawIOBase):
+    """Binary file wrapper feeding a `ContentHash` with the bytes read through it."""
+
+    def __init__(self, file, content_hash):
+        self.file = file
+        self.content_hash = content_hash
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.file.read(len(buffer))
+        buffer[: len(data)] = data
+        if self.content_hash is not None:
+            self.content_hash.update(data)
+        return len(data)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+class ContentHash:
+    """
+    The blake2b hash of a file, fed by the first read of the file that wraps it.
+
+    The hash is complete once that read reaches the end of the file. Otherwise,
+    the file is hashed on its own when the manifest is written.
+    """
+
+    def __init__(self, path, fs):
+        self.path = path
+        self.fs = fs
+        self.complete = False
+        self._digest = None
+
+    def wrap(self, file):
+        """
+        Wrap a binary file, so that reading it feeds the hash.
+
+        Only the first wrapped read feeds the hash: later reads of the same file,
+        such as a section written to several sinks, pass through.
+
+        Args:
+        - file (object): Binary file object, positioned at the start of the file.
+
+        Returns:
+        - HashingReader: The wrapped file.
+        """
+        if self._digest is not None:
+            return HashingReader(file, None)
+        self._digest = hashlib.blake2b()
+        return HashingReader(file, self)
+
+    def update(self, data):
+        if not data:
+            self.complete = True
+        elif not self.complete:
+            self._digest.update(data)
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+
+class Manifest:
+    """Collect the metadata and content hashes of the files emitted by a run."""
+
+    def __init__(self, root, workers=None):
+        """
+        Args:
+        - root (str): Path of the rendered tree, which listed paths are relative to.
+        - workers (int, optional): Number of files hashed concurrently.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.root = root
+        self.files = []
+        self._pool = ThreadPoolExecutor(workers)
+
+    def add(self, path, fs, hash_content=True):
+        """
+        Record an emitted file.
+
+        Args:
+        - path (str): Path to the file.
+        - fs (object): Filesystem backend the file was read from.
+        - hash_content (bool, optional): Whether to hash the content of the file.
+
+        Returns:
+        - ContentHash: The hash of the file, for the renderer to feed while it reads
+                       the file, or None if the content isn't hashed.
+        """
+        stat = fs.stat(path)
+        content_hash = ContentHash(path, fs) if hash_content else None
+
+        relative_path = os.path.relpath(path, self.root) if self.root else path
+        self.files.append(
+            {
+                "path": relative_path.replace(os.sep, "/"),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "blake2b": content_hash,
+            }
+        )
+        return content_hash
+
+    def write(self, manifest_path):
+        """
+        Finish the hashes the renderer didn't complete and write the manifest as JSON.
+
+        The manifest is written to a temporary file first and moved into place,
+        so readers never observe a partial manifest.
+
+        Args:
+        - manifest_path (str): Path of the manifest file.
+        """
+        pending = {}
+        for entry in self.files:
+            content_hash = entry["blake2b"]
+            if content_hash is None or content_hash.complete:
+                continue
+            # Other backends, such as archives, can't be read from several threads at once
+            if isinstance(content_hash.fs, LocalFileSystem):
+                pending[id(entry)] = self._pool.submit(hash_file, content_hash.path)
+
+        for entry in self.files:
+            content_hash = entry["blake2b"]
+            if content_hash is None:
+                continue
+            if content_hash.complete:
+                entry["blake2b"] = content_hash.hexdigest()
+            elif id(entry) in pending:
+                entry["blake2b"] = pending[id(entry)].result()
+            else:
+                entry["blake2b"] = hash_file(content_hash.path, content_hash.fs.open)
+
+        temporary_path = f"{manifest_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"files": self.files}, file, indent=1)
+            file.write("\n")
+        os.replace(temporary_path, manifest_path)
+
+    def close(self):
+        """Stop the hashing workers."""
+        self._pool.shutdown(cancel_futures=True)
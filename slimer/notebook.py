@@ -0,0 +1,222 @@
+"""
+Jupyter notebook extraction.
+
+Notebooks are JSON documents whose outputs, such as base64 encoded images, are
+often much larger than their code. Only the cell sources are displayed, and
+outputs are dropped or summarized in a line each. Notebooks are parsed one cell
+at a time, so memory is bounded by the largest cell rather than the notebook.
+"""
+
+import json
+
+READ_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+
+class JSONStream:
+    """Decode JSON values one at a time from a text stream."""
+
+    def __init__(self, file, read_size=READ_SIZE):
+        self.file = file
+        self.read_size = read_size
+        self.buffer = ""
+        self.position = 0
+        self.exhausted = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Read more of the stream, at least doubling the unconsumed buffer."""
+        consumed, self.position = self.position, 0
+        self.buffer = self.buffer[consumed:]
+        chunk = self.file.read(max(self.read_size, len(self.buffer)))
+        self.exhausted = not chunk
+        self.buffer += chunk
+
+    def peek(self):
+        """Get the next non-whitespace character, or an empty string at the end."""
+        while True:
+            while self.position < len(self.buffer):
+                if self.buffer[self.position] not in WHITESPACE:
+                    return self.buffer[self.position]
+                self.position += 1
+            self._fill()
+            if self.exhausted:
+                return ""
+
+    def expect(self, characters):
+        """Consume the next non-whitespace character, which must be one of `characters`."""
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(f"Expected one of {characters!r}, got {character!r}")
+        self.position += 1
+        return character
+
+    def value(self):
+        """Decode the next value, reading as much of the stream as it spans."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.exhausted:
+                    raise
+                self._fill()
+                continue
+
+            # Numbers and literals may continue past the end of the buffer
+            if end == len(self.buffer) and not self.exhausted:
+                self._fill()
+                continue
+            self.position = end
+            return value
+
+    def items(self):
+        """
+        Decode the keys of an object one at a time.
+
+        The caller consumes the value of each key, with `value` or `elements`,
+        before the next key is decoded.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def elements(self):
+        """Decode the elements of an array one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def get_text(value):
+    """Join the source or text of a cell, which notebooks store as a string or list of lines."""
+    return "".join(value) if isinstance(value, list) else value
+
+
+def summarize_output(output):
+    """
+    Summarize a cell output in a single line.
+
+    Args:
+    - output (dict): The output, as stored in the notebook.
+
+    Returns:
+    - str: The summary.
+    """
+    output_type = output.get("output_type", "output")
+    if output_type == "stream":
+        lines = get_text(output.get("text", "")).splitlines()
+        first_line = lines[0] if lines else ""
+        more = f" (+{len(lines) - 1} lines)" if len(lines) > 1 else ""
+        return f"[{output.get('name', 'stream')}] {first_line}{more}"
+    if output_type == "error":
+        return f"[error] {output.get('ename', '')}: {output.get('evalue', '')}"
+
+    data = output.get("data", {})
+    parts = [
+        f"{mime} ({len(get_text(content)):,} chars)" for mime, content in data.items()
+    ]
+    return f"[{output_type}] {', '.join(parts)}"
+
+
+def extract_cell(cell, summarize_outputs):
+    """
+    Keep the parts of a cell that are displayed, so its outputs can be freed right away.
+
+    Args:
+    - cell (dict): The cell, as stored in the notebook.
+    - summarize_outputs (bool): Whether to summarize outputs instead of dropping them.
+
+    Returns:
+    - tuple: The cell type, its source and the summaries of its outputs.
+    """
+    source = get_text(cell.get("source", "")).rstrip("\n")
+    outputs = cell.get("outputs", []) if summarize_outputs else []
+    return cell.get("cell_type"), source, [summarize_output(o) for o in outputs]
+
+
+def render_cell(cell_type, source, summaries, language):
+    """
+    Render a notebook cell as a fenced block, followed by the summary of its outputs.
+
+    Args:
+    - cell_type (str): The type of the cell, "code", "markdown" or "raw".
+    - source (str): The source of the cell.
+    - summaries (list): The summaries of the outputs of the cell.
+    - language (str): The language of code cells.
+
+    Returns:
+    - str: The rendered cell, or an empty string for empty cells.
+    """
+    if not source.strip() and not summaries:
+        return ""
+
+    fence = {"code": language, "markdown": "markdown"}.get(cell_type, "")
+    rendered = f"```{fence}\n{source}\n```\n"
+    if summaries:
+        rendered += "```output\n" + "\n".join(summaries) + "\n```\n"
+    return rendered
+
+
+def get_notebook_language(metadata):
+    """Get the language of the code cells from the notebook metadata."""
+    language_info = metadata.get("language_info", {})
+    kernelspec = metadata.get("kernelspec", {})
+    return language_info.get("name") or kernelspec.get("language") or "python"
+
+
+def render_notebook(item_path, fs, summarize_outputs=False, limit=None):
+    """
+    Render the cells of a notebook, without their outputs.
+
+    Args:
+    - item_path (str): Path to the notebook.
+    - fs (object): Filesystem backend to read from.
+    - summarize_outputs (bool, optional): Whether to summarize outputs instead of dropping them.
+    - limit (int, optional): Stop reading cells once their sources exceed this many characters.
+
+    Returns:
+    - str: The rendered cells, or None if the file isn't a valid notebook.
+    """
+    cells = []
+    metadata = {}
+    size = 0
+    truncated = False
+
+    with fs.open(item_path, "r", encoding="utf-8", errors="replace") as file:
+        stream = JSONStream(file)
+        try:
+            for key in stream.items():
+                if key == "cells":
+                    for cell in stream.elements():
+                        cells.append(extract_cell(cell, summarize_outputs))
+                        size += len(cells[-1][1])
+                        if limit and size >= limit:
+                            truncated = True
+                            break
+                    if truncated:
+                        # The rest of the notebook is left unparsed
+                        break
+                elif key == "metadata":
+                    metadata = stream.value()
+                else:
+                    stream.value()
+        except (ValueError, AttributeError):
+            return None
+
+    # The metadata usually comes after the cells, so code is fenced once it is known
+    language = get_notebook_language(metadata)
+    rendered = "".join(render_cell(*cell, language) for cell in cells)
+    return f"{rendered}...[more cells...]\n" if truncated else rendered
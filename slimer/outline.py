@@ -0,0 +1,115 @@
+"""
+Python skeleton extraction.
+
+Outlines keep the API shape of a module (imports, class and function signatures
+and optionally the first line of docstrings) and drop every body, which usually
+shrinks a file by an order of magnitude. Outlines are cached by file mtime and
+size, so a long-running process only parses files that changed.
+"""
+
+import ast
+
+INDENT = "    "
+
+_outline_cache = {}
+
+
+def get_signature(node):
+    """Get the signature line of a class or function definition."""
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(base) for base in node.bases + node.keywords]
+        return (
+            f"class {node.name}({', '.join(bases)}):"
+            if bases
+            else f"class {node.name}:"
+        )
+
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}:"
+
+
+def get_docstring_line(node, depth):
+    """Get the first line of a node's docstring as an indented source line."""
+    docstring = ast.get_docstring(node)
+    if not docstring:
+        return None
+    first_line = docstring.strip().splitlines()[0].replace('"""', r"\"\"\"")
+    return f'{INDENT * depth}"""{first_line}"""'
+
+
+def outline_body(body, depth, lines, docstrings):
+    """Append the outline of a list of statements to `lines`."""
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(INDENT * depth + ast.unparse(node))
+        elif isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            for decorator in node.decorator_list:
+                lines.append(f"{INDENT * depth}@{ast.unparse(decorator)}")
+            lines.append(INDENT * depth + get_signature(node))
+
+            body_start = len(lines)
+            docstring_line = get_docstring_line(node, depth + 1)
+            if docstrings and docstring_line:
+                lines.append(docstring_line)
+            if isinstance(node, ast.ClassDef):
+                outline_body(node.body, depth + 1, lines, docstrings)
+            if len(lines) == body_start:
+                lines.append(f"{INDENT * (depth + 1)}...")
+
+
+def outline_python(source, docstrings=False):
+    """
+    Outline the provided Python source code.
+
+    Args:
+    - source (str): The Python source code.
+    - docstrings (bool, optional): Whether to keep the first line of docstrings.
+
+    Returns:
+    - str: Imports, class and function signatures of the source code.
+
+    Raises:
+    - SyntaxError: If the source code can't be parsed.
+    """
+    tree = ast.parse(source)
+    lines = []
+
+    docstring_line = get_docstring_line(tree, 0)
+    if docstrings and docstring_line:
+        lines.append(docstring_line)
+
+    outline_body(tree.body, 0, lines, docstrings)
+    return "\n".join(lines)
+
+
+def get_python_outline(item_path, fs, docstrings=False):
+    """
+    Get the outline of a Python file, reusing the cached outline when it is unchanged.
+
+    Args:
+    - item_path (str): Path to the file.
+    - fs (object): Filesystem backend to read from.
+    - docstrings (bool, optional): Whether to keep the first line of docstrings.
+
+    Returns:
+    - str: The outline, or None if the file can't be parsed.
+    """
+    stat = fs.stat(item_path)
+    key = (item_path, docstrings)
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _outline_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with fs.open(item_path, "r", encoding="utf-8", errors="replace") as file:
+        source = file.read()
+
+    try:
+        outline = outline_python(source, docstrings)
+    except (SyntaxError, ValueError):
+        outline = None
+
+    _outline_cache[key] = (version, outline)
+    return outline
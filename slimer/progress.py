@@ -0,0 +1,97 @@
+"""
+Live progress display for long runs.
+
+The walker only updates its run statistics, and a background thread renders
+them to stderr at a fixed low rate, so progress reporting adds no work to the
+loop producing the output.
+"""
+
+import shutil
+import sys
+import threading
+import time
+
+from slimer.sinks import FileContentSection
+
+REFRESH_INTERVAL = 0.25
+
+
+def format_megabytes(size):
+    """Format a number of bytes in megabytes."""
+    return f"{size / (1024 * 1024):,.1f} MB"
+
+
+class ProgressReporter:
+    """Render run statistics and the output size to a terminal while the output is produced."""
+
+    def __init__(self, stats, stream=None, interval=REFRESH_INTERVAL):
+        """
+        Args:
+        - stats (dict): Run statistics, updated in place by the walker.
+        - stream (file, optional): Terminal to render to. Defaults to stderr.
+        - interval (float, optional): Seconds between two renderings.
+        """
+        self.stats = stats
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.output_size = 0
+        self._started = None
+        self._stopped = threading.Event()
+
+    def track(self, sections):
+        """
+        Pass output sections through, reporting progress until they are exhausted.
+
+        Args:
+        - sections (iterable): Output sections, as generated by the walker.
+
+        Yields:
+        - str: The same sections.
+        """
+        self._started = time.monotonic()
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+
+        try:
+            for section in sections:
+                if isinstance(section, str):
+                    self.output_size += len(section)
+                elif isinstance(section, FileContentSection):
+                    self.output_size += (
+                        len(section.header) + section.size + len(section.footer)
+                    )
+                yield section
+        finally:
+            self._stopped.set()
+            thread.join()
+            self.stream.write("\r\x1b[K")
+            self.stream.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.stream.write(f"\r{self.format_line()}\x1b[K")
+            self.stream.flush()
+
+    def format_line(self):
+        """
+        Format the current progress on a single line that fits the terminal.
+
+        Returns:
+        - str: The progress line.
+        """
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        rate = self.stats.get("bytes_read", 0) / elapsed
+        line = (
+            f"{self.stats.get('directories', 0):,} dirs, "
+            f"{self.stats.get('files', 0):,} files, "
+            f"{format_megabytes(rate)}/s read, "
+            f"{format_megabytes(self.output_size)} output: "
+        )
+
+        # The current path is shortened from the left, where it is least informative
+        path = self.stats.get("current_path", "")
+        room = shutil.get_terminal_size().columns - len(line) - 1
+        if len(path) > room:
+            kept = room - 3
+            path = "..." + path[-kept:] if kept > 0 else ""
+        return line + path
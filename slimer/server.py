@@ -0,0 +1,233 @@
+"""
+Long-running daemon answering render requests over a unix domain socket.
+
+The daemon keeps a warm model of every directory tree it has rendered:
+directory listings are reused for as long as the directory mtime is unchanged,
+and file contents are reused for as long as the file mtime and size are
+unchanged. Repeated requests therefore skip interpreter startup, imports and
+most of the filesystem work.
+
+Usage:
+    $ slimer serve [--socket PATH]
+"""
+
+import argparse
+import collections
+import contextlib
+import io
+import json
+import os
+import socketserver
+
+from slimer.client import default_socket_path
+from slimer.filesystem import LocalFileSystem, is_archive
+from slimer.main import iter_directory_output, parse_arguments
+
+MAX_CACHED_FILE_SIZE = 1024 * 1024
+MAX_CACHE_SIZE = 256 * 1024 * 1024
+
+
+class CachedEntry:
+    """An `os.DirEntry`-like snapshot kept in a cached directory listing."""
+
+    def __init__(self, entry):
+        self.name = entry.name
+        self.path = entry.path
+        self._is_dir = entry.is_dir()
+        self._is_symlink = entry.is_symlink()
+        self._inode = entry.inode()
+
+    def is_dir(self, follow_symlinks=True):
+        return self._is_dir
+
+    def is_symlink(self):
+        return self._is_symlink
+
+    def inode(self):
+        return self._inode
+
+    def stat(self, follow_symlinks=True):
+        # File edits don't change the directory mtime, so metadata is always fresh
+        return os.stat(self.path, follow_symlinks=follow_symlinks)
+
+
+class CachingFileSystem(LocalFileSystem):
+    """
+    Local filesystem backend that memoizes listings and file contents.
+
+    Cached data is validated against mtimes on every access, so callers always
+    observe the current state of the tree.
+    """
+
+    def __init__(
+        self, max_file_size=MAX_CACHED_FILE_SIZE, max_cache_size=MAX_CACHE_SIZE
+    ):
+        self.max_file_size = max_file_size
+        self.max_cache_size = max_cache_size
+        self._listings = {}
+        self._contents = collections.OrderedDict()
+        self._cache_size = 0
+
+    def scandir(self, path):
+        mtime_ns = os.stat(path).st_mtime_ns
+        cached = self._listings.get(path)
+        if cached is None or cached[0] != mtime_ns:
+            entries = [CachedEntry(entry) for entry in super().scandir(path)]
+            cached = self._listings[path] = (mtime_ns, entries)
+        return iter(cached[1])
+
+    def open(self, path, mode="r", encoding=None, errors=None):
+        stat = os.stat(path)
+        if stat.st_size > self.max_file_size:
+            return super().open(path, mode, encoding=encoding, errors=errors)
+
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._contents.get(path)
+        if cached is None or cached[0] != key:
+            with open(path, "rb") as file:
+                data = file.read()
+            self._store_content(path, key, data)
+        else:
+            self._contents.move_to_end(path)
+            data = cached[1]
+
+        stream = io.BytesIO(data)
+        if "b" in mode:
+            return stream
+        return io.TextIOWrapper(stream, encoding=encoding, errors=errors)
+
+    def _store_content(self, path, key, data):
+        """Cache file content, evicting the least recently used files when full."""
+        previous = self._contents.pop(path, None)
+        if previous is not None:
+            self._cache_size -= len(previous[1])
+
+        self._contents[path] = (key, data)
+        self._cache_size += len(data)
+
+        while self._cache_size > self.max_cache_size:
+            _, (_, evicted) = self._contents.popitem(last=False)
+            self._cache_size -= len(evicted)
+
+
+class RenderRequestHandler(socketserver.StreamRequestHandler):
+    """Handle a single JSON encoded render request."""
+
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        # One JSON message per line, so neither side holds the whole output
+        for message in self.server.render(request.get("argv", []), request.get("cwd")):
+            self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+
+
+class SlimerServer(socketserver.UnixStreamServer):
+    """
+    Unix socket server rendering directories with a warm cache.
+
+    All roots share one cache, so its size bound holds for the whole daemon.
+    Requests are served one at a time, so the cache needs no locking.
+    """
+
+    def __init__(self, socket_path):
+        self.filesystem = CachingFileSystem()
+        super().__init__(socket_path, RenderRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def render(self, argv, cwd=None):
+        """
+        Render the output for a command line, as the `slimer` CLI would.
+
+        Sections are yielded as they are rendered, each in a `{"section": ...}`
+        message. The last message holds the exit status, and either an error or
+        the run statistics (with `--stats`). Output options are left to the
+        client, which parses its own command line.
+
+        Args:
+        - argv (list): Command line arguments, without the program name.
+        - cwd (str, optional): Directory relative paths are resolved against.
+
+        Yields:
+        - dict: The messages of the response.
+        """
+        cwd = cwd or os.getcwd()
+        messages = io.StringIO()
+
+        try:
+            with contextlib.redirect_stdout(messages), contextlib.redirect_stderr(
+                messages
+            ):
+                args = parse_arguments(argv)
+        except SystemExit as e:
+            # --help and --version exit successfully with their text as output
+            if e.code:
+                yield {"status": e.code, "error": messages.getvalue().rstrip()}
+            else:
+                yield {"section": messages.getvalue().rstrip()}
+                yield {"status": 0}
+            return
+
+        absolute_path = os.path.abspath(os.path.join(cwd, args.path))
+        if args.manifest:
+            args.manifest = os.path.join(cwd, args.manifest)
+        if args.since_snapshot:
+            args.since_snapshot = os.path.join(cwd, args.since_snapshot)
+        if args.files_from == "-":
+            yield {
+                "status": 2,
+                "error": "--files-from - can't read the client's stdin through the daemon.",
+            }
+            return
+        if args.files_from:
+            args.files_from = os.path.join(cwd, args.files_from)
+        if args.index:
+            args.index = os.path.join(cwd, args.index)
+        if not os.path.exists(absolute_path):
+            yield {"status": 1, "error": f"Path '{args.path}' not found."}
+            return
+
+        try:
+            fs = None
+            # Listed and indexed trees get their own backend from iter_directory_output
+            if not (is_archive(absolute_path) or args.files_from or args.index):
+                fs = self.filesystem
+            stats = {} if args.stats else None
+            for section in iter_directory_output(
+                args, absolute_path, fs=fs, stats=stats
+            ):
+                yield {"section": str(section)}
+        except Exception as e:
+            yield {"status": 1, "error": f"An unexpected error occurred: {str(e)}"}
+            return
+
+        yield {"status": 0, "stats": stats}
+
+
+def serve(argv=None):
+    """
+    Run the daemon until interrupted.
+
+    Args:
+    - argv (list, optional): Command line arguments of the `serve` subcommand.
+    """
+    parser = argparse.ArgumentParser(
+        prog="slimer serve",
+        description="Serve render requests over a unix domain socket.",
+    )
+    parser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        help="Path of the unix socket to listen on.",
+    )
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.socket):
+        os.remove(args.socket)
+
+    with SlimerServer(args.socket) as server:
+        print(f"Slimer daemon listening on {args.socket}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(args.socket)
@@ -0,0 +1,543 @@
+"""
+Output destinations that consume rendered sections as they are produced.
+
+Every sink exposes `write(section)` and `close()` and can be used as a context
+manager, so the renderer can stream sections without knowing where they go.
+"""
+
+import io
+import os
+import sys
+
+from slimer.constants import CHARS_PER_TOKEN
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class FileContentSection:
+    """
+    A rendered file section whose content is copied verbatim from the source file.
+
+    File sinks copy the content as raw bytes, without decoding it. Other sinks use
+    the text rendering returned by `str()`, which is identical.
+    """
+
+    def __init__(self, header, path, size, footer, content_hash=None):
+        self.header = header
+        self.path = path
+        self.size = size
+        self.footer = footer
+        self.content_hash = content_hash
+
+    def __str__(self):
+        if self.content_hash is None:
+            file = open(self.path, "r", encoding="utf-8", errors="replace")
+        else:
+            raw = io.BufferedReader(self.content_hash.wrap(open(self.path, "rb")))
+            file = io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+        with file:
+            return f"{self.header}{file.read()}{self.footer}"
+
+
+def copy_file_bytes(path, out_fd, size, content_hash=None):
+    """
+    Copy up to `size` bytes of a file to a file descriptor.
+
+    Uses `os.sendfile` so the bytes never enter user space, and falls back to a
+    buffered copy where it isn't supported, or when the bytes feed `content_hash`.
+    """
+    with open(path, "rb") as file:
+        offset = 0
+        source = file
+        if content_hash is not None:
+            source = content_hash.wrap(file)
+        else:
+            try:
+                while offset < size:
+                    sent = os.sendfile(out_fd, file.fileno(), offset, size - offset)
+                    if not sent:
+                        return
+                    offset += sent
+                return
+            except (AttributeError, OSError):
+                file.seek(offset)
+
+        while offset < size:
+            chunk = source.read(min(COPY_CHUNK_SIZE, size - offset))
+            if not chunk:
+                return
+            view = memoryview(chunk)
+            while view:
+                written = os.write(out_fd, view)
+                view = view[written:]
+            offset += len(chunk)
+
+        if content_hash is not None:
+            # Reaching the end of the file completes its hash
+            source.read(1)
+
+
+class Sink:
+    """Base class for output destinations."""
+
+    def write(self, section):
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and release the destination."""
+
+    def abort(self):
+        """Release the destination after a failed render."""
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ConsoleSink(Sink):
+    """Print sections to standard output, followed by a final newline."""
+
+    def write(self, section):
+        sys.stdout.write(str(section))
+
+    def close(self):
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+
+
+def copies_raw_bytes(output_file, shard_size=None):
+    """
+    Check if the sink for an output file copies file content sections as raw bytes.
+
+    Raw copies would bypass compression, sharding and newline translation.
+    """
+    if not output_file or shard_size or os.linesep != "\n":
+        return False
+    return not output_file.lower().endswith((".gz", ".xz"))
+
+
+class FileSink(Sink):
+    """
+    Write sections to a UTF-8 encoded file.
+
+    Files ending in `.gz` or `.xz` are compressed incrementally as sections are
+    written, so the uncompressed output is never held in memory. Otherwise, file
+    content sections are copied as raw bytes from their source file.
+    """
+
+    def __init__(self, output_file, compression_level=None):
+        lower_path = output_file.lower()
+        self.copy_raw_bytes = copies_raw_bytes(output_file)
+        if lower_path.endswith(".gz"):
+            import gzip
+
+            level = 9 if compression_level is None else compression_level
+            self.file = gzip.open(
+                output_file, "wt", compresslevel=level, encoding="utf-8"
+            )
+        elif lower_path.endswith(".xz"):
+            import lzma
+
+            self.file = lzma.open(
+                output_file, "wt", preset=compression_level, encoding="utf-8"
+            )
+        else:
+            self.file = open(output_file, "w", encoding="utf-8")
+
+    def write(self, section):
+        if isinstance(section, FileContentSection) and self.copy_raw_bytes:
+            self.file.write(section.header)
+            self.file.flush()
+            copy_file_bytes(
+                section.path, self.file.fileno(), section.size, section.content_hash
+            )
+            self.file.write(section.footer)
+        else:
+            self.file.write(str(section))
+
+    def close(self):
+        self.file.close()
+
+
+def measure_chars(text):
+    return len(text)
+
+
+def measure_tokens(text):
+    """Estimate the number of tokens in a text from its length."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+SHARD_UNITS = {"chars": measure_chars, "tokens": measure_tokens}
+
+
+def get_shard_path(output_file, index):
+    """
+    Get the path of a numbered shard, e.g. `out.md` -> `out.001.md`.
+
+    Compression extensions are kept last, e.g. `out.md.gz` -> `out.001.md.gz`.
+    """
+    root, ext = os.path.splitext(output_file)
+    if ext.lower() in (".gz", ".xz"):
+        root, inner_ext = os.path.splitext(root)
+        ext = inner_ext + ext
+    return f"{root}.{index:03d}{ext}"
+
+
+def split_lines(text, max_size, measure):
+    """
+    Split a text into pieces no larger than `max_size`, cutting at line ends.
+
+    Lines that are larger than `max_size` on their own are cut mid-line.
+    """
+    pieces = []
+    current = ""
+    for line in text.splitlines(keepends=True):
+        while measure(line) > max_size:
+            cut = max(1, len(line) * max_size // measure(line))
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:cut])
+            line = line[cut:]
+        if current and measure(current + line) > max_size:
+            pieces.append(current)
+            current = ""
+        current += line
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def iter_fenced_blocks(body):
+    """
+    Split the body of a section into its fenced blocks, and the text between them.
+
+    Yields:
+    - tuple: Each block, and whether it is fenced.
+    """
+    current = ""
+    inside = False
+    for line in body.splitlines(keepends=True):
+        if line.startswith("```") and not inside and current:
+            yield current, False
+            current = ""
+        current += line
+        if line.startswith("```"):
+            if inside:
+                yield current, True
+                current = ""
+            inside = not inside
+    if current:
+        # Unclosed blocks are split as plain lines
+        yield current, False
+
+
+def split_fenced_block(block, max_size, measure):
+    """Split a fenced block at line boundaries into fenced blocks no larger than `max_size`."""
+    lines = block.split("\n")
+    fence = lines[0]
+    content = "\n".join(lines[1:-2]) + "\n"
+    # Room for a newline ending pieces cut mid-line, before their closing fence
+    overhead = measure(f"{fence}\n\n```\n")
+    pieces = split_lines(content, max(1, max_size - overhead), measure)
+    pieces = [piece if piece.endswith("\n") else f"{piece}\n" for piece in pieces]
+    return [f"{fence}\n{piece}```\n" for piece in pieces]
+
+
+def split_section(section, max_size, measure):
+    """
+    Split an oversized section into pieces no larger than `max_size`.
+
+    File sections are split into numbered parts, each with its own header line.
+    Parts are cut between fenced blocks, such as the cells of notebooks, and
+    blocks too large for a part are split at line boundaries into blocks with
+    their own fences, so that no fence is cut in half.
+    """
+    header, _, body = section.partition("\n")
+    if not body.startswith("```"):
+        return split_lines(section, max_size, measure)
+
+    header = header.rstrip()
+    budget = max(1, max_size - measure(f"{header} (part 000/000)\n"))
+    parts = []
+    current = ""
+    for block, is_fenced in iter_fenced_blocks(body):
+        if measure(block) <= budget:
+            pieces = [block]
+        elif is_fenced:
+            pieces = split_fenced_block(block, budget, measure)
+        else:
+            pieces = split_lines(block, budget, measure)
+
+        for piece in pieces:
+            if current and measure(current + piece) > budget:
+                parts.append(current)
+                current = ""
+            current += piece
+    if current:
+        parts.append(current)
+
+    return [
+        f"{header} (part {index}/{len(parts)})\n{part}"
+        for index, part in enumerate(parts, start=1)
+    ]
+
+
+class ShardedFileSink(Sink):
+    """
+    Write sections to numbered shard files of bounded size.
+
+    Shards are only cut between sections, and oversized file sections are split
+    into fenced parts. Each shard starts with a small tree header listing what it
+    contains, and is written as soon as it is full, while rendering continues.
+    """
+
+    def __init__(
+        self, output_file, shard_size, shard_unit="chars", compression_level=None
+    ):
+        self.output_file = output_file
+        self.shard_size = shard_size
+        self.measure = SHARD_UNITS[shard_unit]
+        self.compression_level = compression_level
+        self.shard_count = 0
+        self.ancestors = []
+        self._start_shard()
+
+    def _start_shard(self):
+        # Directories opened in previous shards give context to the tree header
+        self.tree_lines = list(self.ancestors)
+        self.sections = []
+        self.size = self.measure(self._header(self.tree_lines))
+
+    def _header(self, tree_lines):
+        lines = "".join(f"{line}\n" for line in tree_lines)
+        return f"Shard {self.shard_count + 1} contents:\n{lines}\n"
+
+    def _flush_shard(self):
+        if not self.sections:
+            return
+
+        path = get_shard_path(self.output_file, self.shard_count + 1)
+        with FileSink(path, self.compression_level) as sink:
+            sink.write(self._header(self.tree_lines))
+            for section in self.sections:
+                sink.write(section)
+
+        self.shard_count += 1
+        self._start_shard()
+
+    def _add_section(self, section, tree_line):
+        size = self.measure(section) + self.measure(tree_line + "\n")
+        if self.sections and self.size + size > self.shard_size:
+            self._flush_shard()
+
+        self.sections.append(section)
+        self.tree_lines.append(tree_line)
+        self.size += size
+
+    def write(self, section):
+        section = str(section)
+        tree_line = section.split("\n", 1)[0].rstrip()
+        stripped_line = tree_line.lstrip(" ")
+
+        # Sections are indented by two spaces per level, which closes deeper directories
+        depth = (len(tree_line) - len(stripped_line)) // 2
+        self.ancestors = self.ancestors[:depth]
+
+        if self.measure(section) + self.measure(tree_line + "\n") > self.shard_size:
+            # Each part must fit in a fresh shard next to its own tree line
+            header_size = self.measure(self._header(self.ancestors))
+            line_size = self.measure(f"{tree_line} (part 000/000)\n")
+            part_size = max(1, self.shard_size - header_size - line_size)
+            for part in split_section(section, part_size, self.measure):
+                self._add_section(part, part.split("\n", 1)[0].rstrip())
+        else:
+            self._add_section(section, tree_line)
+
+        if stripped_line.startswith("/") and stripped_line.endswith(":"):
+            self.ancestors.append(tree_line)
+
+    def close(self):
+        self._flush_shard()
+
+
+def find_clipboard_command():
+    """
+    Find a clipboard helper that accepts content on its standard input.
+
+    Returns:
+    - list: The command to run, or None if no supported helper is available.
+    """
+    import shutil
+
+    if sys.platform == "darwin":
+        candidates = [["pbcopy"]]
+    else:
+        candidates = []
+        if os.environ.get("WAYLAND_DISPLAY"):
+            candidates.append(["wl-copy"])
+        if os.environ.get("DISPLAY"):
+            candidates.append(["xclip", "-selection", "clipboard"])
+            candidates.append(["xsel", "--clipboard", "--input"])
+
+    for command in candidates:
+        if shutil.which(command[0]):
+            return command
+    return None
+
+
+class ClipboardSink(Sink):
+    """
+    Stream sections into the clipboard.
+
+    Sections are piped to a clipboard helper (pbcopy, wl-copy, xclip or xsel) as
+    they are produced, so copying overlaps with rendering and memory stays bounded.
+    When no helper is available, sections are collected and handed to pyperclip,
+    which needs the whole output at once: past `max_memory` characters, the copy
+    fails rather than holding more than that in memory.
+    """
+
+    def __init__(self, command=None, max_memory=None):
+        command = command or find_clipboard_command()
+        self.sections = None
+        self.size = 0
+        self.max_memory = max_memory
+        self.process = None
+
+        if command:
+            import subprocess  # nosec B404
+
+            self.process = subprocess.Popen(  # nosec B603
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                close_fds=True,
+            )
+        else:
+            self.sections = []
+
+    def write(self, section):
+        section = str(section)
+        if self.process:
+            self.process.stdin.write(section.encode("utf-8"))
+            return
+
+        self.size += len(section)
+        if self.max_memory is not None and self.size > self.max_memory:
+            raise RuntimeError(
+                "Output exceeds --max-memory and no clipboard helper is available to stream it."
+            )
+        self.sections.append(section)
+
+    def close(self):
+        if self.process:
+            self.process.stdin.close()
+            if self.process.wait() != 0:
+                raise RuntimeError(
+                    f"Clipboard helper exited with status {self.process.returncode}"
+                )
+        else:
+            import pyperclip
+
+            pyperclip.copy("".join(self.sections))
+
+    def abort(self):
+        # Leave the clipboard untouched rather than filling it with partial output
+        if self.process:
+            self.process.kill()
+            self.process.wait()
+
+
+class TeeSink(Sink):
+    """
+    Write sections to several sinks, so a single render serves all of them.
+
+    File content sections are rendered to text at most once, for the sinks that
+    can't copy them as raw bytes.
+    """
+
+    def __init__(self, sinks):
+        self.sinks = sinks
+
+    def write(self, section):
+        text = None
+        for sink in self.sinks:
+            if isinstance(section, FileContentSection) and getattr(
+                sink, "copy_raw_bytes", False
+            ):
+                sink.write(section)
+            else:
+                if text is None:
+                    text = str(section)
+                sink.write(text)
+
+    def close(self):
+        # Every sink is closed, even if closing another one failed
+        error = None
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+    def abort(self):
+        for sink in self.sinks:
+            sink.abort()
+
+
+def open_sink(
+    copy_to_clipboard,
+    output_file=None,
+    compression_level=None,
+    shard_size=None,
+    shard_unit="chars",
+    max_memory=None,
+    print_output=False,
+):
+    """
+    Open the sink matching the output arguments.
+
+    Several destinations can be requested together, in which case every one of
+    them is fed the same sections. The console is used when no other is requested.
+
+    Args:
+    - copy_to_clipboard (bool): Whether to copy the output to clipboard.
+    - output_file (str): Path to the file where the output will be written.
+    - compression_level (int, optional): Compression level for `.gz` and `.xz` output files.
+    - shard_size (int, optional): Split the output file into shards of at most this size.
+    - shard_unit (str, optional): Unit of `shard_size`, either "chars" or "tokens".
+    - max_memory (int, optional): Characters of output a sink that needs the whole
+                                  output may hold in memory before failing.
+    - print_output (bool, optional): Whether to also print the output to the console.
+
+    Returns:
+    - Sink: The sink to stream the output to.
+    """
+    sinks = []
+    try:
+        if output_file and shard_size:
+            sinks.append(
+                ShardedFileSink(output_file, shard_size, shard_unit, compression_level)
+            )
+        elif output_file:
+            sinks.append(FileSink(output_file, compression_level))
+        if copy_to_clipboard:
+            sinks.append(ClipboardSink(max_memory=max_memory))
+    except Exception:
+        for sink in sinks:
+            sink.abort()
+        raise
+
+    if print_output or not sinks:
+        sinks.append(ConsoleSink())
+    return sinks[0] if len(sinks) == 1 else TeeSink(sinks)
@@ -0,0 +1,141 @@
+"""
+Delta output relative to a previous run.
+
+A snapshot stores, for every file displayed by a run, its size, mtime, a hash
+of its rendered section and the section itself. The next run skips files whose
+size and mtime are unchanged, renders the others, and only displays the files
+added, removed or modified since, with unified diffs for the modified ones.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+
+SNAPSHOT_VERSION = 1
+
+
+def hash_section(section):
+    """Hash a rendered section with blake2b."""
+    return hashlib.blake2b(section.encode("utf-8")).hexdigest()
+
+
+class Snapshot:
+    """The rendered files of the previous run, and those of the current one."""
+
+    def __init__(self, snapshot_path, root, options):
+        """
+        Args:
+        - snapshot_path (str): Path of the snapshot file. A missing file is an empty snapshot.
+        - root (str): Path of the rendered tree, which recorded paths are relative to.
+        - options (dict): Options affecting how files are rendered. Files of a snapshot
+                          taken with other options are rendered again.
+        """
+        self.snapshot_path = snapshot_path
+        self.root = root
+        self.options = options
+        self.previous = {}
+        self.current = {}
+        self._reusable = False
+
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding="utf-8") as file:
+                state = json.load(file)
+            if state.get("version") == SNAPSHOT_VERSION:
+                self.previous = state["files"]
+                self._reusable = state.get("options") == options
+
+    def get_key(self, path):
+        """Get the key of a file, its path relative to the root with forward slashes."""
+        relative_path = os.path.relpath(path, self.root) if self.root else path
+        return relative_path.replace(os.sep, "/")
+
+    def reuse(self, path, stat):
+        """
+        Carry a file over from the previous snapshot if it is unchanged.
+
+        Args:
+        - path (str): Path to the file.
+        - stat (stat_result): Current status of the file.
+
+        Returns:
+        - bool: True if the file is unchanged and doesn't need to be rendered.
+        """
+        key = self.get_key(path)
+        previous = self.previous.get(key)
+        if not self._reusable or previous is None:
+            return False
+        if (previous["size"], previous["mtime"]) != (stat.st_size, stat.st_mtime):
+            return False
+
+        self.current[key] = previous
+        return True
+
+    def record(self, path, stat, section):
+        """
+        Record the rendered section of a file.
+
+        Args:
+        - path (str): Path to the file.
+        - stat (stat_result): Current status of the file.
+        - section (str): The rendered section.
+        """
+        section = str(section)
+        self.current[self.get_key(path)] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "blake2b": hash_section(section),
+            "section": section,
+        }
+
+    def iter_changes(self):
+        """
+        Generate the sections of the files added, modified and removed since the snapshot.
+
+        Yields:
+        - str: Formatted sections describing the changes.
+        """
+        added, modified = [], []
+        for key, entry in self.current.items():
+            previous = self.previous.get(key)
+            if previous is None:
+                added.append(key)
+            elif previous["blake2b"] != entry["blake2b"]:
+                modified.append(key)
+        removed = [key for key in self.previous if key not in self.current]
+
+        if not (added or modified or removed):
+            yield "No changes since the snapshot.\n"
+            return
+
+        yield (
+            f"Changes since the snapshot: {len(added):,} added, "
+            f"{len(modified):,} modified, {len(removed):,} removed.\n\n"
+        )
+        for key in added:
+            yield f"-- added: {key}\n{self.current[key]['section']}"
+        for key in modified:
+            diff = difflib.unified_diff(
+                self.previous[key]["section"].splitlines(keepends=True),
+                self.current[key]["section"].splitlines(keepends=True),
+                f"a/{key}",
+                f"b/{key}",
+            )
+            # A longer fence, so the fences of the diffed sections can't close it
+            yield f"-- modified: {key}\n````diff\n{''.join(diff)}````\n"
+        for key in removed:
+            yield f"-- removed: {key}\n"
+
+    def write(self):
+        """Write the current state as the new snapshot, replacing the previous one atomically."""
+        temporary_path = f"{self.snapshot_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": SNAPSHOT_VERSION,
+                    "options": self.options,
+                    "files": self.current,
+                },
+                file,
+            )
+        os.replace(temporary_path, self.snapshot_path)
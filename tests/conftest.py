@@ -0,0 +1,18 @@
+import os
+
+
+def write_file(path, content, mtime_ns=None):
+    mode = "wb" if isinstance(content, bytes) else "w"
+    with open(path, mode) as f:
+        f.write(content)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def make_tree(root, width=3, depth=3):
+    for i in range(width):
+        write_file(os.path.join(root, f"file{i}.txt"), f"content {i}")
+        if depth > 1:
+            subdirectory = os.path.join(root, f"dir{i}")
+            os.mkdir(subdirectory)
+            make_tree(subdirectory, width, depth - 1)
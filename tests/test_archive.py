@@ -0,0 +1,162 @@
+import os
+import tarfile
+import tempfile
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from slimer.archive import ArchiveFileSystem
+from slimer.filesystem import is_archive
+from slimer.main import (
+    display_files_in_directory,
+    get_archive_read_limit,
+    get_exclusion_patterns,
+    parse_arguments,
+)
+
+
+def build_tree(root):
+    os.makedirs(os.path.join(root, "src", "pkg"))
+    with open(os.path.join(root, "README.txt"), "w") as f:
+        f.write("Top level readme")
+    with open(os.path.join(root, "src", "main.py"), "w") as f:
+        f.write("# comment\nprint('main')\n")
+    with open(os.path.join(root, "src", "pkg", "util.js"), "w") as f:
+        f.write("// comment\nconsole.log('util');\n")
+    with open(os.path.join(root, "src", "image.png"), "wb") as f:
+        f.write(b"\x89PNG")
+
+
+def make_zip(tree_root, archive_path):
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for directory, _, files in os.walk(tree_root):
+            for name in files:
+                path = os.path.join(directory, name)
+                archive.write(path, os.path.relpath(path, tree_root))
+
+
+def make_tar(tree_root, archive_path):
+    with tarfile.open(archive_path, "w:gz") as archive:
+        archive.add(tree_root, arcname=".")
+
+
+@pytest.mark.parametrize(
+    "archive_name, make_archive",
+    [("snapshot.zip", make_zip), ("snapshot.tar.gz", make_tar)],
+)
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"limit": 5},
+        {"strip_comments": True, "include_binary": True},
+        {"tree_only": True, "exclusion_patterns": {"pkg"}},
+    ],
+)
+def test_archive_output_matches_extracted_tree(archive_name, make_archive, options):
+    with tempfile.TemporaryDirectory() as tempdir:
+        tree_root = os.path.join(tempdir, "tree")
+        build_tree(tree_root)
+        archive_path = os.path.join(tempdir, archive_name)
+        make_archive(tree_root, archive_path)
+
+        expected = display_files_in_directory(tree_root, **options)
+        with ArchiveFileSystem(archive_path) as fs:
+            assert display_files_in_directory("", fs=fs, **options) == expected
+
+
+@pytest.mark.parametrize("compression", ["gz", "xz"])
+def test_compressed_tar_is_read_in_archive_order(compression):
+    with tempfile.TemporaryDirectory() as tempdir:
+        tree_root = os.path.join(tempdir, "tree")
+        build_tree(tree_root)
+        archive_path = os.path.join(tempdir, f"snapshot.tar.{compression}")
+        with tarfile.open(archive_path, f"w:{compression}") as archive:
+            for directory, _, files in os.walk(tree_root):
+                # Members in reverse order, so a sorted walk would seek backwards
+                for name in sorted(files, reverse=True):
+                    path = os.path.join(directory, name)
+                    archive.add(path, os.path.relpath(path, tree_root))
+
+        expected = display_files_in_directory(tree_root)
+        with patch("gzip.GzipFile.seek", side_effect=AssertionError), patch(
+            "lzma.LZMAFile.seek", side_effect=AssertionError
+        ), ArchiveFileSystem(archive_path) as fs:
+            assert display_files_in_directory("", fs=fs) == expected
+
+
+def test_compressed_tar_spools_only_what_is_read():
+    with tempfile.TemporaryDirectory() as tempdir:
+        tree_root = os.path.join(tempdir, "tree")
+        build_tree(tree_root)
+        os.makedirs(os.path.join(tree_root, "node_modules", "dep"))
+        with open(os.path.join(tree_root, "node_modules", "dep", "index.js"), "w") as f:
+            f.write("x" * 100_000)
+        with open(os.path.join(tree_root, "large.txt"), "w") as f:
+            f.write("y" * 100_000)
+        archive_path = os.path.join(tempdir, "snapshot.tar.gz")
+        make_tar(tree_root, archive_path)
+
+        args = parse_arguments([archive_path, "-l", "10"])
+        read_limit = get_archive_read_limit(args, get_exclusion_patterns(args))
+        expected = display_files_in_directory(
+            tree_root, limit=10, exclusion_patterns=get_exclusion_patterns(args)
+        )
+        with ArchiveFileSystem(archive_path, read_limit) as fs:
+            output = display_files_in_directory(
+                "", fs=fs, limit=10, exclusion_patterns=get_exclusion_patterns(args)
+            )
+            spooled = fs._spool.seek(0, os.SEEK_END)
+
+        assert output == expected
+        assert spooled < 1000
+
+
+@pytest.mark.parametrize("archive_name", ["snapshot.tar", "snapshot.tar.gz"])
+def test_tar_links_match_extracted_tree(archive_name):
+    with tempfile.TemporaryDirectory() as tempdir:
+        tree_root = os.path.join(tempdir, "tree")
+        build_tree(tree_root)
+        os.symlink("main.py", os.path.join(tree_root, "src", "alias.py"))
+        os.symlink(
+            "../../README.txt", os.path.join(tree_root, "src", "pkg", "up.txt")
+        )
+        os.link(
+            os.path.join(tree_root, "README.txt"), os.path.join(tree_root, "hard.txt")
+        )
+        os.symlink("pkg", os.path.join(tree_root, "src", "linked_dir"))
+        os.symlink("/etc/hostname", os.path.join(tree_root, "outside.txt"))
+        archive_path = os.path.join(tempdir, archive_name)
+        mode = "w:gz" if archive_name.endswith(".gz") else "w"
+        with tarfile.open(archive_path, mode) as archive:
+            archive.add(tree_root, arcname=".")
+
+        # Links to directories and outside of the archive are left out
+        os.remove(os.path.join(tree_root, "src", "linked_dir"))
+        os.remove(os.path.join(tree_root, "outside.txt"))
+        expected = display_files_in_directory(tree_root)
+        with ArchiveFileSystem(archive_path) as fs:
+            assert display_files_in_directory("", fs=fs) == expected
+
+
+def test_archive_ignores_unsafe_member_names():
+    with tempfile.TemporaryDirectory() as tempdir:
+        archive_path = os.path.join(tempdir, "unsafe.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("../escape.txt", "nope")
+            archive.writestr("safe.txt", "yes")
+
+        with ArchiveFileSystem(archive_path) as fs:
+            assert [entry.name for entry in fs.scandir("")] == ["safe.txt"]
+
+
+def test_is_archive():
+    with tempfile.TemporaryDirectory() as tempdir:
+        archive_path = os.path.join(tempdir, "snapshot.tar.gz")
+        with tarfile.open(archive_path, "w:gz"):
+            pass
+
+        assert is_archive(archive_path)
+        assert not is_archive(tempdir)
+        assert not is_archive(os.path.join(tempdir, "missing.zip"))
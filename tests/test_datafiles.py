@@ -0,0 +1,132 @@
+import io
+import json
+import os
+import tempfile
+
+from slimer.datafiles import (
+    summarize_csv,
+    summarize_json,
+    summarize_json_lines,
+    summarize_sql,
+    summarize_yaml,
+)
+from slimer.main import display_files_in_directory, generate_output_for_file
+
+
+def test_summarize_json_array():
+    records = [
+        {"id": i, "name": f"n{i}", "score": None if i else 1.5} for i in range(10)
+    ]
+    summary = summarize_json(io.StringIO(json.dumps(records)), 2)
+
+    assert summary == (
+        "array of 10 elements\n"
+        "element fields:\n"
+        "  id: int\n"
+        "  name: str\n"
+        "  score: float | null\n"
+        "10 elements\n"
+        "first 2 elements:\n"
+        '  {"id": 0, "name": "n0", "score": 1.5}\n'
+        '  {"id": 1, "name": "n1", "score": null}\n'
+    )
+
+
+def test_summarize_json_object():
+    document = {"version": 2, "config": {"a": 1, "b": 2}, "items": [{"x": 1}] * 3}
+    summary = summarize_json(io.StringIO(json.dumps(document)), 1)
+
+    assert summary == (
+        "object with 3 keys\n"
+        "  version: int = 2\n"
+        "  config: object {a, ...}\n"
+        "  items: list of 3 elements\n"
+        "    x: int\n"
+        '    {"x": 1}\n'
+    )
+
+
+def test_summarize_json_lines():
+    lines = "".join(json.dumps({"event": "e", "n": i}) + "\n" for i in range(4))
+    summary = summarize_json_lines(io.StringIO(lines), 1)
+
+    assert summary == (
+        "fields:\n"
+        "  event: str\n"
+        "  n: int\n"
+        "4 records\n"
+        "first 1 records:\n"
+        '  {"event": "e", "n": 0}\n'
+    )
+
+
+def test_summarize_csv():
+    summary = summarize_csv(io.StringIO('id,name\n1,"a, b"\n2,\n3,c\n'), 2)
+
+    assert summary == (
+        "columns:\n"
+        "  id: int\n"
+        "  name: str | null\n"
+        "3 rows\n"
+        "first 2 rows:\n"
+        "  1,a, b\n"
+        "  2,\n"
+    )
+
+
+def test_summarize_yaml():
+    content = "---\nname: app\n# comment\nservices:\n  web: {}\nports:\n- 80\n- 443\n"
+    summary = summarize_yaml(io.StringIO(content), 5)
+
+    assert summary == (
+        "3 keys:\n" "  name: scalar\n" "  services: mapping\n" "  ports: sequence\n"
+    )
+
+
+def test_summarize_sql():
+    content = (
+        "CREATE TABLE users (\n  id int\n);\n"
+        "INSERT INTO `users` VALUES (1);\n"
+        "INSERT INTO users(id) VALUES (2);\n"
+    )
+    summary = summarize_sql(io.StringIO(content), 1)
+
+    assert summary == (
+        "CREATE TABLE users (\n  id int\n);\n"
+        "-- 2 inserts into users\n"
+        "INSERT INTO `users` VALUES (1);\n"
+    )
+
+
+def test_generate_output_summarizes_large_data_files_only():
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = os.path.join(tempdir, "data.csv")
+        with open(path, "w") as f:
+            f.write("id\n" + "".join(f"{i}\n" for i in range(100)))
+
+        output = generate_output_for_file(
+            "data.csv", path, 0, 50, False, summarize_data=1
+        )
+        assert output == (
+            f"-- {'data.csv':<40} (summary of 293 bytes)\n"
+            "```\ncolumns:\n  id: int\n100 rows\nfirst 1 rows:\n  0\n```\n"
+        )
+
+        output = generate_output_for_file(
+            "data.csv", path, 0, None, False, summarize_data=1
+        )
+        assert "summary" not in output
+
+
+def test_skip_generated_keeps_summarized_data_files():
+    with tempfile.TemporaryDirectory() as tempdir:
+        rows = [{"id": i, "name": f"row {i}"} for i in range(3000)]
+        with open(os.path.join(tempdir, "rows.json"), "w") as f:
+            json.dump(rows, f)
+
+        output = display_files_in_directory(
+            tempdir, skip_generated=True, summarize_data=2
+        )
+
+    assert "generated file" not in output
+    assert "array of 3,000 elements" in output
@@ -0,0 +1,126 @@
+import io
+import os
+import tempfile
+
+from slimer.filesystem import ListedFileSystem, ParallelFileSystem, iter_listed_paths
+from slimer.main import display_files_in_directory
+from tests.conftest import make_tree
+
+
+def test_parallel_filesystem_matches_serial_output():
+    with tempfile.TemporaryDirectory() as tempdir:
+        make_tree(tempdir)
+        expected = display_files_in_directory(tempdir)
+
+        for workers in (1, 4):
+            with ParallelFileSystem(workers) as fs:
+                assert display_files_in_directory(tempdir, fs=fs) == expected
+
+
+def wait_for_workers(fs):
+    done = 0
+    while done < len(fs._listings):
+        futures = list(fs._listings.values())
+        for future in futures:
+            future.result()
+        done = len(futures)
+    return set(fs._listings)
+
+
+def test_parallel_filesystem_handles_symlink_loops():
+    with tempfile.TemporaryDirectory() as tempdir:
+        make_tree(tempdir)
+        os.symlink(tempdir, os.path.join(tempdir, "dir0", "loop"))
+        expected = display_files_in_directory(tempdir)
+
+        with ParallelFileSystem(4) as fs:
+            assert display_files_in_directory(tempdir, fs=fs) == expected
+
+
+def test_parallel_filesystem_prefetches_within_depth_limit():
+    with tempfile.TemporaryDirectory() as tempdir:
+        make_tree(tempdir)
+
+        with ParallelFileSystem(2, depth_limit=2) as fs:
+            list(fs.scandir(tempdir))
+            prefetched = wait_for_workers(fs)
+
+        assert prefetched == {os.path.join(tempdir, f"dir{i}") for i in range(3)}
+
+
+def test_parallel_filesystem_skips_excluded_directories():
+    with tempfile.TemporaryDirectory() as tempdir:
+        make_tree(tempdir)
+
+        with ParallelFileSystem(2, exclude=lambda name: name == "dir1") as fs:
+            list(fs.scandir(tempdir))
+            prefetched = wait_for_workers(fs)
+
+        assert len(prefetched) == 6
+        assert not any("dir1" in path for path in prefetched)
+
+
+def test_parallel_filesystem_bounds_listings_held_ahead():
+    with tempfile.TemporaryDirectory() as tempdir:
+        make_tree(tempdir, width=4)
+
+        with ParallelFileSystem(4, max_pending=5) as fs:
+            list(fs.scandir(tempdir))
+            assert len(wait_for_workers(fs)) == 5
+
+
+def test_parallel_filesystem_skips_directories_the_walker_drops():
+    with tempfile.TemporaryDirectory() as tempdir:
+        make_tree(tempdir, depth=2)
+        os.utime(os.path.join(tempdir, "dir0"), (0, 0))
+
+        with ParallelFileSystem(2, max_entries=2, modified_since=1) as fs:
+            list(fs.scandir(tempdir))
+            prefetched = wait_for_workers(fs)
+
+        # Only dir0 and dir1 are displayed, and dir0 is too old
+        assert prefetched == {os.path.join(tempdir, "dir1")}
+
+
+def test_iter_listed_paths_detects_separator():
+    assert list(iter_listed_paths(io.BytesIO(b"a\0dir/b\nc.py\0d.py"), 4)) == [
+        "a",
+        "dir/b\nc.py",
+        "d.py",
+    ]
+    assert list(iter_listed_paths(io.BytesIO(b"a.py\r\n\ndir/b.py"), 4)) == [
+        "a.py",
+        "dir/b.py",
+    ]
+
+
+def test_listed_filesystem_builds_tree_from_paths():
+    with tempfile.TemporaryDirectory() as tempdir:
+        make_tree(tempdir)
+        paths = ["dir0/dir1/file2.txt", "file0.txt", "../outside.txt", tempdir]
+        paths.append(os.path.join(tempdir, "dir0", "file1.txt"))
+
+        fs = ListedFileSystem(tempdir, paths)
+        output = display_files_in_directory(tempdir, fs=fs)
+
+        assert output == (
+            "/dir0:\n"
+            "  /dir1:\n"
+            f"    -- {'file2.txt':<40}\n```\ncontent 2\n```\n"
+            f"  -- {'file1.txt':<40}\n```\ncontent 1\n```\n"
+            f"-- {'file0.txt':<40}\n```\ncontent 0\n```\n"
+        )
+
+
+def test_listed_filesystem_keeps_listed_directories_and_skips_missing_paths():
+    with tempfile.TemporaryDirectory() as tempdir:
+        make_tree(tempdir, width=1, depth=2)
+        os.mkdir(os.path.join(tempdir, "empty"))
+        paths = ["dir0", "dir0/file0.txt", "empty", "missing.txt", "gone/"]
+
+        fs = ListedFileSystem(tempdir, paths)
+        output = display_files_in_directory(tempdir, fs=fs)
+
+        assert output == (
+            "/dir0:\n" f"  -- {'file0.txt':<40}\n```\ncontent 0\n```\n" "/empty:\n"
+        )
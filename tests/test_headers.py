@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+from slimer.filesystem import LocalFileSystem
+from slimer.headers import (
+    find_shared_headers,
+    iter_header_candidates,
+    strip_shared_header,
+)
+from slimer.main import display_files_in_directory
+from tests.conftest import write_file
+
+BANNER = "".join(f"# Copyright line {i}\n" for i in range(6))
+
+
+def test_find_shared_headers_picks_longest_shared_prefix():
+    with tempfile.TemporaryDirectory() as tempdir:
+        os.mkdir(os.path.join(tempdir, "sub"))
+        for i in range(3):
+            write_file(os.path.join(tempdir, "sub", f"m{i}.py"), f"{BANNER}x = {i}\n")
+        write_file(os.path.join(tempdir, "other.py"), f"{BANNER[:40]}y = 1\n")
+        write_file(os.path.join(tempdir, "image.png"), BANNER)
+
+        fs = LocalFileSystem()
+        candidates = list(iter_header_candidates(fs, tempdir, set()))
+        assert len(candidates) == 4
+
+        headers = find_shared_headers(fs, candidates)
+        assert headers == {BANNER: (1, 3)}
+
+
+def test_shared_headers_are_elided_from_files():
+    with tempfile.TemporaryDirectory() as tempdir:
+        write_file(os.path.join(tempdir, "a.py"), f"{BANNER}a = 1\n")
+        write_file(os.path.join(tempdir, "b.py"), BANNER)
+
+        output = display_files_in_directory(tempdir, shared_headers={BANNER: (1, 3)})
+
+        assert (
+            f"-- {'a.py':<40} (shared header 1 elided)\n```python\na = 1\n\n```\n"
+            in output
+        )
+        # Files that are nothing but the header keep it
+        assert f"-- {'b.py':<40}\n```python\n{BANNER}\n```\n" in output
+
+
+def test_strip_shared_header_prefers_longest_block():
+    headers = {"a\nb\n": (1, 5), "a\nb\nc\n": (2, 3)}
+    assert strip_shared_header("a\nb\nc\nd\n", headers) == ("d\n", 2)
+    assert strip_shared_header("a\nb\nd\n", headers) == ("d\n", 1)
+    assert strip_shared_header("z\n", headers) == ("z\n", None)
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+# Generous enough for slow CI runners, tight enough to catch an eager heavy import
+IMPORT_TIME_BUDGET_US = 50_000
+
+LAZY_MODULES = ["argparse", "fnmatch", "pyperclip", "re", "time", "zipfile", "tarfile"]
+
+
+def run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True
+    )
+
+
+def test_import_does_not_load_lazy_modules():
+    script = (
+        "import sys\n"
+        "before = set(sys.modules)\n"
+        "import slimer.main\n"
+        f"print(sorted(set(sys.modules) - before & set({LAZY_MODULES!r})))\n"
+    )
+    assert run_python("-c", script).stdout.strip() == "[]"
+
+
+def test_import_time_within_budget():
+    result = run_python("-X", "importtime", "-c", "import slimer.main")
+
+    # Lines look like "import time: <self us> | <cumulative us> | <module>"
+    cumulative_times = {}
+    for line in result.stderr.splitlines():
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            cumulative_times[name.strip()] = int(cumulative)
+
+    assert cumulative_times["slimer.main"] < IMPORT_TIME_BUDGET_US
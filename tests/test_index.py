@@ -0,0 +1,105 @@
+import os
+import tempfile
+import time
+from unittest import mock
+
+from slimer.index import IndexedFileSystem
+from slimer.main import display_files_in_directory
+from tests.conftest import make_tree, write_file
+
+
+def test_indexed_filesystem_matches_local_output():
+    with tempfile.TemporaryDirectory() as tempdir:
+        root = os.path.join(tempdir, "root")
+        os.mkdir(root)
+        make_tree(root, width=2, depth=2)
+        index_path = os.path.join(tempdir, "index.db")
+        expected = display_files_in_directory(root)
+
+        for _ in range(2):
+            with IndexedFileSystem(index_path) as fs:
+                assert display_files_in_directory(root, fs=fs) == expected
+
+
+def test_indexed_filesystem_detects_changes_across_runs():
+    with tempfile.TemporaryDirectory() as tempdir:
+        root = os.path.join(tempdir, "root")
+        os.mkdir(root)
+        make_tree(root, width=1, depth=2)
+        index_path = os.path.join(tempdir, "index.db")
+        with IndexedFileSystem(index_path) as fs:
+            display_files_in_directory(root, fs=fs)
+
+        write_file(os.path.join(root, "file0.txt"), "b" * 10, mtime_ns=2_000_000_000)
+        os.remove(os.path.join(root, "dir0", "file0.txt"))
+        os.rmdir(os.path.join(root, "dir0"))
+        write_file(os.path.join(root, "c.txt"), "c")
+
+        with IndexedFileSystem(index_path) as fs:
+            entries = {entry.name: entry for entry in fs.scandir(root)}
+            assert sorted(entries) == ["c.txt", "file0.txt"]
+            assert entries["file0.txt"].stat().st_size == 10
+            assert entries["file0.txt"].stat().st_mtime_ns == 2_000_000_000
+            assert fs._connection.execute(
+                "SELECT COUNT(*) FROM entries WHERE parent = ?",
+                (os.path.join(root, "dir0"),),
+            ).fetchone() == (0,)
+
+
+def test_indexed_filesystem_applies_filters_in_queries():
+    with tempfile.TemporaryDirectory() as tempdir:
+        root = os.path.join(tempdir, "root")
+        os.mkdir(root)
+        make_tree(root, width=1, depth=2)
+        write_file(os.path.join(root, "dir0", "a.py"), "print('a')")
+        write_file(os.path.join(root, "old.py"), "old", mtime_ns=1_000_000_000)
+        write_file(os.path.join(root, "image.png"), "")
+        index_path = os.path.join(tempdir, "index.db")
+
+        with IndexedFileSystem(
+            index_path,
+            modified_since=time.time() - 60,
+            file_extensions=[".py"],
+            include_binary=False,
+        ) as fs:
+            assert sorted(entry.name for entry in fs.scandir(root)) == ["dir0"]
+            assert [entry.name for entry in fs.scandir(os.path.join(root, "dir0"))] == [
+                "a.py"
+            ]
+
+
+def test_indexed_filesystem_trusts_unchanged_directories():
+    with tempfile.TemporaryDirectory() as tempdir:
+        root = os.path.join(tempdir, "root")
+        os.mkdir(root)
+        make_tree(root, width=2, depth=2)
+        index_path = os.path.join(tempdir, "index.db")
+        with IndexedFileSystem(index_path) as fs:
+            expected = display_files_in_directory(root, fs=fs)
+
+        with mock.patch("os.stat", wraps=os.stat) as mock_stat:
+            with IndexedFileSystem(index_path) as fs:
+                assert display_files_in_directory(root, fs=fs) == expected
+        stated = {call.args[0] for call in mock_stat.call_args_list}
+        assert stated and all(os.path.isdir(path) for path in stated)
+
+
+def test_indexed_filesystem_serves_filters_from_one_subtree_query():
+    with tempfile.TemporaryDirectory() as tempdir:
+        root = os.path.join(tempdir, "root")
+        os.mkdir(root)
+        make_tree(root, width=2, depth=3)
+        write_file(os.path.join(root, "dir0", "dir1", "a.py"), "print('a')")
+        index_path = os.path.join(tempdir, "index.db")
+        with IndexedFileSystem(index_path) as fs:
+            display_files_in_directory(root, fs=fs)
+
+        expected = display_files_in_directory(root, file_extensions=[".py"])
+        with IndexedFileSystem(index_path, file_extensions=[".py"]) as fs:
+            statements = []
+            fs._connection.set_trace_callback(statements.append)
+            assert display_files_in_directory(root, fs=fs) == expected
+        assert sum("parent >" in statement for statement in statements) == 1
+        assert not any(
+            statement.startswith("SELECT path, name") for statement in statements
+        )
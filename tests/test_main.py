@@ -9,8 +9,12 @@ from slimer.main import is_binary_file
 from slimer.main import should_exclude
 from slimer.main import read_file_content
 from slimer.main import remove_comments
+from slimer.main import minify_content
+from slimer.main import get_required_literal
 from slimer.main import generate_output_for_file
 from slimer.main import display_files_in_directory
+from slimer.main import iter_files_in_directory
+from slimer.main import file_matches
 from slimer.main import get_exclusion_patterns
 from slimer.main import parse_arguments
 from slimer.main import get_directory_output
@@ -19,6 +23,9 @@ from slimer.main import process_directory
 from slimer.main import handle_output
 from slimer.main import main
 from slimer.constants import EXCLUDED_FILES, EXCLUDED_DIRECTORIES
+from slimer.filesystem import LocalFileSystem
+from slimer.sinks import FileContentSection
+from tests.conftest import make_tree, write_file
 
 """
   tests for is_binary_file Function
@@ -177,6 +184,88 @@ def test_remove_comments_no_comments_javascript():
     assert remove_comments(code, "javascript") == expected
 
 
+"""
+  tests for get_required_literal
+"""
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        ("parse_arguments", ("parse_arguments", True)),
+        (r"def\s+parse_\w+\(", ("parse_", False)),
+        (r"colou?r_name", ("r_name", False)),
+        (r"x{2,3}yz", ("yz", False)),
+        (r"(optional)?required", ("required", False)),
+        (r"[abc]+d\.e", ("d.e", False)),
+        (r"foo|bar", (None, False)),
+        (r"(?i)foo", (None, False)),
+        (r"\d+", (None, False)),
+    ],
+)
+def test_get_required_literal(pattern, expected):
+    assert get_required_literal(pattern) == expected
+
+
+"""
+  tests for minify_content
+"""
+
+
+def test_minify_content_collapses_blank_lines_and_trailing_whitespace():
+    code = "\n\ndef f():   \n    return 1\n\n\n\nf()  \n\n"
+    expected = "def f():\n    return 1\n\nf()"
+    assert minify_content(code, "python") == expected
+
+
+def test_minify_content_compacts_json():
+    content = '{\n    "name": "slimer",\n    "tags": [\n        "cli", "é"\n    ]\n}\n'
+    assert minify_content(content, "json") == '{"name":"slimer","tags":["cli","é"]}'
+
+
+def test_minify_content_keeps_json_tokens():
+    content = '{"v": 1.10, "big": 1e400, "a": 1, "a": 2, "s": "x  y\\" z"}'
+    assert minify_content(content, "json") == (
+        '{"v":1.10,"big":1e400,"a":1,"a":2,"s":"x  y\\" z"}'
+    )
+
+
+def test_minify_content_dedents_truncated_json_and_xml():
+    assert minify_content('{\n    "a": 1,\n    "b"', "json") == '{\n"a": 1,\n"b"'
+    assert minify_content("<a>\n    <b/>\n</a>\n", "xml") == "<a>\n<b/>\n</a>"
+
+
+def test_minify_content_keeps_yaml_indentation():
+    content = "root:\n  child:\n    - item   \n"
+    assert minify_content(content, "yaml") == "root:\n  child:\n    - item"
+
+
+def test_generate_output_with_minify_counts_saved_bytes():
+    temp_file_path = create_temporary_file("a = 1   \n\n\n\nb = 2\n")
+    stats = {}
+    output = generate_output_for_file(
+        "test.py", temp_file_path, 0, None, False, minify=True, stats=stats
+    )
+    assert output == (
+        "-- test.py                                 \n"
+        "```python\n"
+        "a = 1\n\nb = 2\n"
+        "```\n"
+    )
+    assert stats["minify_bytes_saved"] == 6
+    if CAN_DELETE_TEMP_FILES:
+        os.remove(temp_file_path)
+
+
+def test_generate_output_counts_bytes_read():
+    temp_file_path = create_temporary_file("naïve = '€'\n")
+    stats = {}
+    generate_output_for_file("test.py", temp_file_path, 0, None, False, stats=stats)
+    assert stats["bytes_read"] == os.path.getsize(temp_file_path) == 15
+    if CAN_DELETE_TEMP_FILES:
+        os.remove(temp_file_path)
+
+
 """
   tests for generate_output_for_file
 """
@@ -321,6 +410,180 @@ def test_display_files_specific_extension():
         assert "-- note.txt" not in output
 
 
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="requires symlinks")
+def test_display_files_symlink_loop():
+    with tempfile.TemporaryDirectory() as tempdir:
+        subdir = os.path.join(tempdir, "subdir")
+        os.mkdir(subdir)
+        with open(os.path.join(subdir, "file1.txt"), "w") as f:
+            f.write("Hello Subdir!")
+        os.symlink(tempdir, os.path.join(subdir, "loop"))
+        os.link(os.path.join(subdir, "file1.txt"), os.path.join(subdir, "file2.txt"))
+
+        stats = {}
+        output = display_files_in_directory(tempdir, stats=stats)
+        assert output.count("Hello Subdir!") == 1
+        assert "/loop:" not in output
+        assert stats["duplicates_skipped"] == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="requires symlinks")
+def test_display_files_without_following_symlinks():
+    with tempfile.TemporaryDirectory() as tempdir:
+        with open(os.path.join(tempdir, "file1.txt"), "w") as f:
+            f.write("Hello World!")
+        os.symlink(
+            os.path.join(tempdir, "file1.txt"), os.path.join(tempdir, "link.txt")
+        )
+
+        stats = {}
+        output = display_files_in_directory(tempdir, follow_symlinks=False, stats=stats)
+        assert "-- file1.txt" in output
+        assert "-- link.txt" not in output
+        assert stats["symlinks_skipped"] == 1
+
+
+def test_display_files_max_entries_per_dir():
+    with tempfile.TemporaryDirectory() as tempdir:
+        os.mkdir(os.path.join(tempdir, "subdir"))
+        for index in range(5):
+            with open(os.path.join(tempdir, f"data{index}.json"), "w") as f:
+                f.write("{}")
+        with open(os.path.join(tempdir, "notes.txt"), "w") as f:
+            f.write("notes")
+
+        stats = {}
+        output = display_files_in_directory(
+            tempdir, tree_only=True, max_entries_per_dir=2, stats=stats
+        )
+        lines = output.splitlines()
+        assert [line.rstrip() for line in lines] == [
+            "-- data0.json",
+            "-- data1.json",
+            "-- ... 5 more entries (*.json: 3, *.txt: 1, dirs: 1)",
+        ]
+        assert stats["entries_collapsed"] == 5
+
+
+def test_display_files_skip_generated():
+    import base64
+    import random
+
+    files = {
+        "poetry.lock": "[[package]]\n",
+        "bundle.js": "var a=1;" * 200,
+        "schema.go": "// Code generated by protoc. DO NOT EDIT.\npackage schema\n",
+        "blob.txt": base64.b64encode(random.Random(0).randbytes(3000)).decode(),
+        "main.py": "def main():\n    return 'hand written'\n" * 50,
+    }
+    with tempfile.TemporaryDirectory() as tempdir:
+        for name, content in files.items():
+            with open(os.path.join(tempdir, name), "w") as f:
+                f.write(content)
+
+        stats = {}
+        output = display_files_in_directory(tempdir, skip_generated=True, stats=stats)
+        assert "-- poetry.lock (generated file, 12 bytes)\n" in output
+        assert "-- bundle.js (generated file, 1,600 bytes)\n" in output
+        assert "-- schema.go (generated file," in output
+        assert "-- blob.txt (generated file, 4,000 bytes)\n" in output
+        assert "hand written" in output
+        assert stats["generated_files_skipped"] == 4
+
+
+def test_display_files_skip_generated_keeps_long_prose_lines():
+    paragraph = "This paragraph is written on a single line, as prose often is. " * 30
+    with tempfile.TemporaryDirectory() as tempdir:
+        for name in ("notes.md", "notes.txt", "data.json"):
+            write_file(os.path.join(tempdir, name), paragraph)
+
+        output = display_files_in_directory(tempdir, skip_generated=True)
+        assert "-- notes.md (generated file" not in output
+        assert "-- notes.txt (generated file" not in output
+        assert "-- data.json (generated file" in output
+
+
+def test_display_files_tree_with_sizes_and_lines():
+    with tempfile.TemporaryDirectory() as tempdir:
+        os.makedirs(os.path.join(tempdir, "src", "pkg"))
+        files = {
+            "setup.py": "a\nb\n",
+            os.path.join("src", "main.py"): "1\n2\n3\n",
+            os.path.join("src", "pkg", "util.py"): "x" * 1000 + "\n",
+        }
+        for name, content in files.items():
+            with open(os.path.join(tempdir, name), "w") as f:
+                f.write(content)
+
+        output = display_files_in_directory(tempdir, tree_only=True, count_lines=True)
+        assert output.splitlines() == [
+            f"-- {'setup.py':<40} (2 lines, 4 bytes)",
+            "/src: (2 files, 4 lines, 1,007 bytes)",
+            f"  -- {'main.py':<40} (3 lines, 6 bytes)",
+            "  /pkg: (1 files, 1 lines, 1,001 bytes)",
+            f"    -- {'util.py':<40} (1 lines, 1,001 bytes)",
+        ]
+
+        output = display_files_in_directory(tempdir, tree_only=True, show_sizes=True)
+        assert "/src: (2 files, 1,007 bytes)\n" in output
+
+
+def test_tree_counts_files_in_stats():
+    with tempfile.TemporaryDirectory() as tempdir:
+        make_tree(tempdir, width=2, depth=2)
+        for options in ({}, {"show_sizes": True}):
+            stats = {}
+            display_files_in_directory(tempdir, tree_only=True, stats=stats, **options)
+            assert stats["files"] == 6
+
+
+def test_walker_options_are_keyword_only():
+    with tempfile.TemporaryDirectory() as tempdir:
+        with pytest.raises(TypeError):
+            display_files_in_directory(tempdir, 0, 5)
+
+
+def test_display_files_grep():
+    with tempfile.TemporaryDirectory() as tempdir:
+        files = {
+            "literal.py": "x = 1\nparse_arguments()\n",
+            "regex.py": "def parse_file(path):\n    pass\n",
+            "candidate.py": "parse_ is mentioned but never defined\n",
+            "other.py": "print('nothing')\n",
+        }
+        for name, content in files.items():
+            with open(os.path.join(tempdir, name), "w") as f:
+                f.write(content)
+
+        output = display_files_in_directory(tempdir, grep="parse_arguments")
+        assert "-- literal.py" in output
+        assert "-- regex.py" not in output
+
+        stats = {}
+        output = display_files_in_directory(
+            tempdir, grep=r"def\s+parse_\w+", stats=stats
+        )
+        assert "-- regex.py" in output
+        assert "-- literal.py" not in output
+        assert "-- candidate.py" not in output
+        assert stats["files_not_matching"] == 3
+
+        with patch("slimer.main.file_matches", return_value=True) as mock_matches:
+            display_files_in_directory(
+                tempdir, grep="parse_arguments", file_extensions=[".md"]
+            )
+        mock_matches.assert_not_called()
+
+
+def test_file_matches_across_chunks():
+    temp_file_path = create_temporary_file("a" * 10 + "needle" + "b" * 10)
+    fs = LocalFileSystem()
+    assert file_matches(temp_file_path, fs, "needle", chunk_size=13)
+    assert not file_matches(temp_file_path, fs, "needles", chunk_size=13)
+    if CAN_DELETE_TEMP_FILES:
+        os.remove(temp_file_path)
+
+
 def test_display_files_strip_comments():
     with tempfile.TemporaryDirectory() as tempdir:
         with open(os.path.join(tempdir, "script.py"), "w") as f:
@@ -331,6 +594,34 @@ def test_display_files_strip_comments():
         assert 'print("Hello Python!")' in output
 
 
+@pytest.mark.parametrize("limit", [None, 5, 1000])
+def test_passthrough_output_matches_text_output(limit):
+    with tempfile.TemporaryDirectory() as tempdir:
+        source = os.path.join(tempdir, "source")
+        os.mkdir(source)
+        files = {
+            "plain.py": "print('Hello')\n",
+            "unicode.txt": "áéíóúñ\n",
+            "crlf.txt": "line 1\r\nline 2\r\n",
+            "blank.txt": "  \n\n",
+            "invalid.txt": b"ok \xff\xfe bytes",
+        }
+        for name, content in files.items():
+            if isinstance(content, str):
+                content = content.encode()
+            with open(os.path.join(source, name), "wb") as f:
+                f.write(content)
+
+        sections = list(iter_files_in_directory(source, limit=limit, passthrough=True))
+        if limit is None:
+            assert sum(isinstance(s, FileContentSection) for s in sections) == 2
+
+        output_file = os.path.join(tempdir, "output.txt")
+        handle_output(iter(sections), False, output_file)
+        with open(output_file, encoding="utf-8") as f:
+            assert f.read() == display_files_in_directory(source, limit=limit)
+
+
 """
   tests for display_files_in_directory
 """
@@ -415,6 +706,15 @@ def test_parse_arguments_limit(mock_argv):
     assert args.limit == 5
 
 
+def test_parse_arguments_max_memory(mock_argv):
+    mock_argv([PROG_NAME, TEST_PATH, "--max-memory", "64M"])
+    assert parse_arguments().max_memory == 64 * 1024 * 1024
+
+    mock_argv([PROG_NAME, TEST_PATH, "--max-memory", "64X"])
+    with pytest.raises(SystemExit):
+        parse_arguments()
+
+
 def test_parse_arguments_depth(mock_argv):
     mock_argv([PROG_NAME, TEST_PATH, "--depth", "3"])
     args = parse_arguments()
@@ -427,6 +727,12 @@ def test_parse_arguments_exclude(mock_argv):
     assert args.exclude == ["test1", "test2"]
 
 
+def test_parse_arguments_shard_size_requires_output(mock_argv):
+    mock_argv([PROG_NAME, TEST_PATH, "--shard-size", "1000"])
+    with pytest.raises(SystemExit):
+        parse_arguments()
+
+
 """
   tests for get_directory_output
 """
@@ -443,10 +749,27 @@ def test_prepend_append_args():
         recent=None,
         file_extensions=None,
         strip_comments=False,
+        follow_symlinks="always",
+        max_entries_per_dir=None,
+        minify=False,
+        outline=None,
+        skip_generated=False,
+        sizes=False,
+        lines=False,
+        grep=None,
+        since_snapshot=None,
+        manifest=None,
+        summarize_data=None,
+        notebook_outputs=False,
+        dedupe_headers=False,
+        files_from=None,
+        index=None,
+        workers=None,
+        stdout=False,
     )
 
     with patch("slimer.main.get_exclusion_patterns", return_value=[]), patch(
-        "slimer.main.display_files_in_directory", return_value="directory_output"
+        "slimer.main.iter_files_in_directory", return_value=iter(["directory_output"])
     ):
         output = get_directory_output(mock_args, "/dummy/path")
         assert output == "PREPEND\ndirectory_output\nAPPEND"
@@ -463,10 +786,27 @@ def test_no_prepend_append_args():
         recent=None,
         file_extensions=None,
         strip_comments=False,
+        follow_symlinks="always",
+        max_entries_per_dir=None,
+        minify=False,
+        outline=None,
+        skip_generated=False,
+        sizes=False,
+        lines=False,
+        grep=None,
+        since_snapshot=None,
+        manifest=None,
+        summarize_data=None,
+        notebook_outputs=False,
+        dedupe_headers=False,
+        files_from=None,
+        index=None,
+        workers=None,
+        stdout=False,
     )
 
     with patch("slimer.main.get_exclusion_patterns", return_value=[]), patch(
-        "slimer.main.display_files_in_directory", return_value="directory_output"
+        "slimer.main.iter_files_in_directory", return_value=iter(["directory_output"])
     ):
         output = get_directory_output(mock_args, "/dummy/path")
         assert output == "directory_output"
@@ -513,16 +853,51 @@ def test_handle_arguments_invalid_path(capfd, mock_argv):
 
 
 def test_process_directory():
-    mock_args = argparse.Namespace(path="/some/path")
+    mock_args = argparse.Namespace(
+        path="/some/path", output=None, copy=False, stdout=False, shard_size=None
+    )
     absolute_path = "/absolute/path"
 
-    with patch("slimer.main.get_directory_output") as mock_get_directory_output:
-        mock_get_directory_output.return_value = "expected_directory_output"
+    with patch("slimer.main.iter_directory_output") as mock_iter_directory_output:
+        mock_iter_directory_output.return_value = "expected_directory_output"
         result = process_directory(mock_args, absolute_path)
-        mock_get_directory_output.assert_called_once_with(mock_args, absolute_path)
+        mock_iter_directory_output.assert_called_once_with(
+            mock_args,
+            absolute_path,
+            stats=None,
+            passthrough=False,
+            deferred_writes=None,
+        )
         assert result == "expected_directory_output"
 
 
+@pytest.mark.parametrize(
+    "options, passthrough",
+    [
+        ({"output": "out.md"}, True),
+        ({"output": "out.md.gz"}, False),
+        ({"output": "out.md", "shard_size": 1000}, False),
+        ({"output": "out.md", "copy": True}, False),
+        ({"output": "out.md", "stdout": True}, False),
+    ],
+)
+def test_process_directory_passes_through_only_to_raw_file_copies(options, passthrough):
+    args = {"output": None, "copy": False, "stdout": False, "shard_size": None}
+    mock_args = argparse.Namespace(path="/some/path", **{**args, **options})
+
+    with patch(
+        "slimer.main.iter_directory_output"
+    ) as mock_iter_directory_output, patch("os.linesep", "\n"):
+        process_directory(mock_args, "/absolute/path")
+        mock_iter_directory_output.assert_called_once_with(
+            mock_args,
+            "/absolute/path",
+            stats=None,
+            passthrough=passthrough,
+            deferred_writes=None,
+        )
+
+
 """
   tests for handle_output
 """
@@ -547,20 +922,29 @@ def test_handle_output_to_clipboard():
     mock_output = "some_output_content"
 
     # Mocking pyperclip.copy to ensure it gets called correctly
-    with patch("slimer.main.pyperclip.copy") as mock_pyperclip_copy:
+    with patch("slimer.sinks.find_clipboard_command", return_value=None), patch(
+        "pyperclip.copy"
+    ) as mock_pyperclip_copy:
         handle_output(mock_output, copy_to_clipboard=True, output_file=None)
 
     mock_pyperclip_copy.assert_called_once_with(mock_output)
 
 
-def test_handle_output_to_console():
+def test_handle_output_to_console(capsys):
     mock_output = "some_output_content"
 
-    # Mocking the print function to verify the output
-    with patch("builtins.print") as mock_print:
-        handle_output(mock_output, copy_to_clipboard=False, output_file=None)
+    handle_output(mock_output, copy_to_clipboard=False, output_file=None)
+
+    assert capsys.readouterr().out == mock_output + "\n"
+
+
+def test_handle_output_streams_sections_to_file():
+    with tempfile.TemporaryDirectory() as tempdir:
+        output_file = os.path.join(tempdir, "output.txt")
+        handle_output(iter(["first ", "second"]), False, output_file)
 
-    mock_print.assert_called_once_with(mock_output)
+        with open(output_file, encoding="utf-8") as f:
+            assert f.read() == "first second"
 
 
 """
@@ -583,7 +967,14 @@ def test_main_happy_path():
 
         # Ensure the mocked functions were called with the right arguments
         mock_handle_output.assert_called_once_with(
-            mock_output, mock_args.copy, mock_args.output
+            mock_output,
+            mock_args.copy,
+            mock_args.output,
+            mock_args.compression_level,
+            mock_args.shard_size,
+            mock_args.shard_unit,
+            mock_args.max_memory,
+            mock_args.stdout,
         )
 
 
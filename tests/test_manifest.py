@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from unittest.mock import patch
+
+from slimer.main import (
+    get_directory_output,
+    handle_output,
+    iter_directory_output,
+    parse_arguments,
+)
+from tests.conftest import write_file
+
+
+def read_manifest(path):
+    with open(path) as f:
+        return {entry["path"]: entry for entry in json.load(f)["files"]}
+
+
+def test_manifest_lists_displayed_files():
+    with tempfile.TemporaryDirectory() as tempdir:
+        root = os.path.join(tempdir, "root")
+        os.makedirs(os.path.join(root, "sub"))
+        write_file(os.path.join(root, "a.py"), b"print('a')\n")
+        write_file(os.path.join(root, "sub", "b.txt"), b"b" * 3000)
+        write_file(os.path.join(root, "image.png"), b"\x89PNG")
+        manifest_path = os.path.join(tempdir, "manifest.json")
+
+        args = parse_arguments([root, "--manifest", manifest_path, "-l", "10"])
+        get_directory_output(args, root)
+        files = read_manifest(manifest_path)
+
+        assert sorted(files) == ["a.py", "sub/b.txt"]
+        entry = files["sub/b.txt"]
+        assert entry["size"] == 3000
+        assert entry["mtime"] == os.stat(os.path.join(root, "sub", "b.txt")).st_mtime
+        # Truncated files are still hashed in full
+        assert entry["blake2b"] == hashlib.blake2b(b"b" * 3000).hexdigest()
+
+
+def test_manifest_of_archive():
+    with tempfile.TemporaryDirectory() as tempdir:
+        archive_path = os.path.join(tempdir, "snapshot.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("src/main.py", "print('main')\n")
+            archive.writestr("src/long.txt", "x" * 100)
+        manifest_path = os.path.join(tempdir, "manifest.json")
+
+        args = parse_arguments([archive_path, "--manifest", manifest_path, "-l", "10"])
+        get_directory_output(args, archive_path)
+        files = read_manifest(manifest_path)
+
+        assert sorted(files) == ["src/long.txt", "src/main.py"]
+        assert files["src/main.py"]["blake2b"] == (
+            hashlib.blake2b(b"print('main')\n").hexdigest()
+        )
+        assert files["src/long.txt"]["blake2b"] == (
+            hashlib.blake2b(b"x" * 100).hexdigest()
+        )
+
+
+def test_manifest_of_tree_skips_hashes():
+    with tempfile.TemporaryDirectory() as tempdir:
+        root = os.path.join(tempdir, "root")
+        os.mkdir(root)
+        write_file(os.path.join(root, "a.py"), b"print('a')\n")
+        manifest_path = os.path.join(tempdir, "manifest.json")
+
+        args = parse_arguments([root, "--manifest", manifest_path, "--tree"])
+        with patch("slimer.manifest.hash_file") as mock_hash_file:
+            get_directory_output(args, root)
+        mock_hash_file.assert_not_called()
+
+        entry = read_manifest(manifest_path)["a.py"]
+        assert entry["size"] == 11
+        assert entry["blake2b"] is None
+
+
+def test_manifest_hashes_displayed_files_while_rendering():
+    with tempfile.TemporaryDirectory() as tempdir:
+        root = os.path.join(tempdir, "root")
+        os.mkdir(root)
+        write_file(os.path.join(root, "a.py"), b"print('a')\r\n")
+        write_file(os.path.join(root, "b.txt"), "caf\u00e9\n")
+        manifest_path = os.path.join(tempdir, "manifest.json")
+        output_path = os.path.join(tempdir, "out.md")
+
+        for argv in (
+            [root, "--manifest", manifest_path],
+            # Passed through sections are hashed as they are copied to the file
+            [root, "--manifest", manifest_path, "-o", output_path],
+        ):
+            with patch("slimer.manifest.hash_file") as mock_hash_file:
+                handle_output(
+                    iter_directory_output(
+                        parse_arguments(argv), root, passthrough="-o" in argv
+                    ),
+                    False,
+                    output_path if "-o" in argv else None,
+                )
+            mock_hash_file.assert_not_called()
+
+            files = read_manifest(manifest_path)
+            assert files["a.py"]["blake2b"] == (
+                hashlib.blake2b(b"print('a')\r\n").hexdigest()
+            )
+            assert files["b.txt"]["blake2b"] == (
+                hashlib.blake2b("caf\u00e9\n".encode("utf-8")).hexdigest()
+            )
@@ -0,0 +1,127 @@
+import io
+import json
+import os
+import tempfile
+
+import pytest
+
+from slimer.filesystem import LocalFileSystem
+from slimer.main import display_files_in_directory, generate_output_for_file
+from slimer.notebook import JSONStream, render_notebook
+from slimer.sinks import split_section
+
+NOTEBOOK = {
+    "cells": [
+        {"cell_type": "markdown", "metadata": {}, "source": ["# Title\n", "Intro"]},
+        {
+            "cell_type": "code",
+            "execution_count": 1,
+            "metadata": {},
+            "outputs": [
+                {"name": "stdout", "output_type": "stream", "text": ["a\n", "b\n"]},
+                {
+                    "data": {
+                        "image/png": "iVBORw0KGgo" * 1000,
+                        "text/plain": ["<Figure>"],
+                    },
+                    "metadata": {},
+                    "output_type": "display_data",
+                },
+            ],
+            "source": "print('a')",
+        },
+        {"cell_type": "code", "metadata": {}, "outputs": [], "source": []},
+    ],
+    "metadata": {"language_info": {"name": "julia"}},
+    "nbformat": 4,
+    "nbformat_minor": 5,
+}
+
+
+def write_notebook(directory, notebook, name="notebook.ipynb"):
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        json.dump(notebook, f, indent=1)
+    return path
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 4096])
+def test_json_stream_decodes_values_across_reads(read_size):
+    stream = JSONStream(io.StringIO('{"a": [1, {"b": "c"}, 23], "d": true}'), read_size)
+    decoded = {}
+    for key in stream.items():
+        decoded[key] = list(stream.elements()) if key == "a" else stream.value()
+    assert decoded == {"a": [1, {"b": "c"}, 23], "d": True}
+
+
+def test_render_notebook_drops_outputs():
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = write_notebook(tempdir, NOTEBOOK)
+        rendered = render_notebook(path, LocalFileSystem())
+        output = generate_output_for_file("notebook.ipynb", path, 0, None, False)
+
+    assert rendered == "```markdown\n# Title\nIntro\n```\n```julia\nprint('a')\n```\n"
+    assert output == f"-- {'notebook.ipynb':<40} (notebook)\n{rendered}"
+
+
+def test_render_notebook_summarizes_outputs():
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = write_notebook(tempdir, NOTEBOOK)
+        rendered = render_notebook(path, LocalFileSystem(), summarize_outputs=True)
+
+    assert (
+        "```output\n"
+        "[stdout] a (+1 lines)\n"
+        "[display_data] image/png (11,000 chars), text/plain (8 chars)\n"
+        "```\n"
+    ) in rendered
+
+
+def test_render_notebook_stops_at_limit():
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = write_notebook(tempdir, NOTEBOOK)
+        rendered = render_notebook(path, LocalFileSystem(), limit=5)
+
+    assert rendered == "```markdown\n# Title\nIntro\n```\n...[more cells...]\n"
+
+
+def test_generate_output_for_invalid_notebook_falls_back_to_content():
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = os.path.join(tempdir, "broken.ipynb")
+        with open(path, "w") as f:
+            f.write('{"cells": [')
+
+        output = generate_output_for_file("broken.ipynb", path, 0, None, False)
+
+    assert output == f"-- {'broken.ipynb':<40}\n```\n{{\"cells\": [\n```\n"
+
+
+def test_skip_generated_keeps_notebooks_with_image_outputs():
+    with tempfile.TemporaryDirectory() as tempdir:
+        write_notebook(tempdir, NOTEBOOK)
+        output = display_files_in_directory(tempdir, skip_generated=True)
+
+    assert "generated file" not in output
+    assert "print('a')" in output
+
+
+def test_notebook_sections_are_split_between_cells():
+    cells = [
+        {"cell_type": "code", "outputs": [], "source": f"x = {i}\n" * 20}
+        for i in range(20)
+    ]
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = write_notebook(tempdir, {"cells": cells, "metadata": {}})
+        section = generate_output_for_file("notebook.ipynb", path, 0, None, False)
+
+    parts = split_section(section, 1000, len)
+    assert len(parts) > 1
+    bodies = []
+    for index, part in enumerate(parts, start=1):
+        header, body = part.split("\n", 1)
+        assert header.endswith(f"(part {index}/{len(parts)})")
+        assert len(part) <= 1000
+        assert body.startswith("```python\n") and body.endswith("```\n")
+        assert body.count("```") % 2 == 0
+        bodies.append(body)
+    assert "".join(bodies) == section.split("\n", 1)[1]
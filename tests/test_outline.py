@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+from slimer.filesystem import LocalFileSystem
+from slimer.main import display_files_in_directory
+from slimer.outline import get_python_outline, outline_python
+
+SOURCE = '''"""Module docstring.
+
+More details.
+"""
+import os
+from typing import List
+
+
+@decorator(arg=1)
+class Shape(Base, metaclass=Meta):
+    """A shape."""
+
+    sides = 0
+
+    def area(self, scale: float = 1.0) -> float:
+        """Compute the area."""
+        return 0.0 * scale
+
+    async def draw(self, *args, **kwargs):
+        pass
+
+
+def make_shapes(count: int) -> List[Shape]:
+    def helper():
+        pass
+
+    return [Shape() for _ in range(count)]
+'''
+
+
+def test_outline_python_signatures():
+    assert outline_python(SOURCE) == (
+        "import os\n"
+        "from typing import List\n"
+        "@decorator(arg=1)\n"
+        "class Shape(Base, metaclass=Meta):\n"
+        "    def area(self, scale: float=1.0) -> float:\n"
+        "        ...\n"
+        "    async def draw(self, *args, **kwargs):\n"
+        "        ...\n"
+        "def make_shapes(count: int) -> List[Shape]:\n"
+        "    ..."
+    )
+
+
+def test_outline_python_docstrings():
+    outline = outline_python(SOURCE, docstrings=True)
+    assert outline.startswith('"""Module docstring."""\nimport os\n')
+    assert '    """A shape."""\n    def area' in outline
+    assert '        """Compute the area."""\n    async def draw' in outline
+
+
+def test_get_python_outline_is_cached_until_file_changes():
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = os.path.join(tempdir, "module.py")
+        with open(path, "w") as f:
+            f.write("def first():\n    pass\n")
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+        fs = LocalFileSystem()
+        assert get_python_outline(path, fs) == "def first():\n    ..."
+
+        with open(path, "w") as f:
+            f.write("def second():\n    pass\n")
+        os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+        assert get_python_outline(path, fs) == "def second():\n    ..."
+
+
+def test_display_files_outline_falls_back_on_syntax_errors():
+    with tempfile.TemporaryDirectory() as tempdir:
+        with open(os.path.join(tempdir, "good.py"), "w") as f:
+            f.write("def good():\n    return 1\n")
+        with open(os.path.join(tempdir, "bad.py"), "w") as f:
+            f.write("def bad(:\n")
+
+        stats = {}
+        output = display_files_in_directory(tempdir, outline="signatures", stats=stats)
+        assert "-- good.py" in output and "(outline)" in output
+        assert "def good():\n    ...\n" in output
+        assert "return 1" not in output
+        assert "def bad(:\n" in output
+        assert stats["files_outlined"] == 1
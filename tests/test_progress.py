@@ -0,0 +1,37 @@
+import io
+import os
+from unittest.mock import patch
+
+from slimer.progress import ProgressReporter
+from slimer.sinks import FileContentSection
+
+
+def test_progress_reporter_passes_sections_through():
+    stream = io.StringIO()
+    reporter = ProgressReporter({}, stream=stream, interval=0.001)
+    section = FileContentSection("header\n", "unused", 10, "footer\n")
+
+    assert list(reporter.track(["abc", section])) == ["abc", section]
+    assert reporter.output_size == 3 + 7 + 10 + 7
+    assert stream.getvalue().endswith("\r\x1b[K")
+
+
+def test_progress_reporter_formats_line_to_terminal_width():
+    stats = {
+        "directories": 1200,
+        "files": 3,
+        "bytes_read": 0,
+        "current_path": os.path.join("/very", "long", "path", "to", "somewhere"),
+    }
+    reporter = ProgressReporter(stats)
+    reporter._started = 0
+
+    with patch("shutil.get_terminal_size", return_value=os.terminal_size((200, 24))):
+        line = reporter.format_line()
+    assert line.startswith("1,200 dirs, 3 files, 0.0 MB/s read, 0.0 MB output: ")
+    assert line.endswith(stats["current_path"])
+
+    with patch("shutil.get_terminal_size", return_value=os.terminal_size((64, 24))):
+        line = reporter.format_line()
+    assert len(line) == 63
+    assert line.endswith("...somewhere")
@@ -0,0 +1,183 @@
+import os
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+import pytest
+
+from slimer import client
+from slimer.client import iter_render, request_render
+from slimer.server import CachingFileSystem, SlimerServer
+from slimer.main import display_files_in_directory
+from tests.conftest import write_file
+
+
+def test_caching_filesystem_matches_local_output():
+    with tempfile.TemporaryDirectory() as tempdir:
+        os.mkdir(os.path.join(tempdir, "sub"))
+        write_file(os.path.join(tempdir, "sub", "a.py"), "print('a')")
+        write_file(os.path.join(tempdir, "b.txt"), "b")
+
+        fs = CachingFileSystem()
+        expected = display_files_in_directory(tempdir)
+        assert display_files_in_directory(tempdir, fs=fs) == expected
+        assert display_files_in_directory(tempdir, fs=fs) == expected
+
+
+def test_caching_filesystem_detects_changes():
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = os.path.join(tempdir, "a.txt")
+        write_file(path, "old", mtime_ns=1_000_000_000)
+
+        fs = CachingFileSystem()
+        assert "old" in display_files_in_directory(tempdir, fs=fs)
+
+        write_file(path, "new content", mtime_ns=2_000_000_000)
+        write_file(os.path.join(tempdir, "added.txt"), "added")
+        output = display_files_in_directory(tempdir, fs=fs)
+        assert "new content" in output
+        assert "-- added.txt" in output
+
+
+def test_caching_filesystem_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as tempdir:
+        for name in ("a.txt", "b.txt"):
+            write_file(os.path.join(tempdir, name), "12345")
+
+        fs = CachingFileSystem(max_cache_size=8)
+        for name in ("a.txt", "b.txt"):
+            with fs.open(os.path.join(tempdir, name)) as file:
+                assert file.read() == "12345"
+
+        assert list(fs._contents) == [os.path.join(tempdir, "b.txt")]
+
+
+@pytest.fixture
+def server():
+    with tempfile.TemporaryDirectory() as tempdir:
+        socket_path = os.path.join(tempdir, "slimer.sock")
+        with SlimerServer(socket_path) as server:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            yield server, socket_path
+            server.shutdown()
+
+
+def test_server_renders_over_socket(server):
+    server, socket_path = server
+    with tempfile.TemporaryDirectory() as tempdir:
+        write_file(os.path.join(tempdir, "a.txt"), "Hello daemon")
+
+        response = request_render(
+            ["missing-directory", "-l", "5"], socket_path, cwd=os.path.dirname(tempdir)
+        )
+        assert response["status"] == 1
+        assert response["error"] == "Path 'missing-directory' not found."
+
+        response = request_render(
+            [os.path.basename(tempdir)], socket_path, cwd=os.path.dirname(tempdir)
+        )
+        assert response["status"] == 0
+        assert "".join(response["sections"]) == display_files_in_directory(tempdir)
+        assert tempdir in server.filesystem._listings
+
+
+def test_server_reports_argument_errors(server):
+    _, socket_path = server
+    response = request_render(["--limit", "nope"], socket_path)
+    assert response["status"] == 2
+    assert "invalid int value" in response["error"]
+
+
+def test_server_renders_files_from_list(server):
+    _, socket_path = server
+    with tempfile.TemporaryDirectory() as tempdir:
+        os.mkdir(os.path.join(tempdir, "b"))
+        write_file(os.path.join(tempdir, "a.txt"), "a")
+        write_file(os.path.join(tempdir, "b", "y.txt"), "y")
+        write_file(os.path.join(tempdir, "list.txt"), "b/y.txt\n")
+
+        response = request_render(
+            [".", "--files-from", "list.txt"], socket_path, cwd=tempdir
+        )
+        assert response["status"] == 0
+        assert "".join(response["sections"]) == (
+            f"/b:\n  -- {'y.txt':<40}\n```\ny\n```\n"
+        )
+
+        response = request_render([".", "--files-from", "-"], socket_path, cwd=tempdir)
+        assert response["status"] == 2
+
+
+def test_server_builds_index(server):
+    _, socket_path = server
+    with tempfile.TemporaryDirectory() as tempdir:
+        os.mkdir(os.path.join(tempdir, "tree"))
+        write_file(os.path.join(tempdir, "tree", "a.txt"), "a")
+
+        response = request_render(
+            ["tree", "--index", "idx.db"], socket_path, cwd=tempdir
+        )
+        assert response["status"] == 0
+        assert "".join(response["sections"]) == display_files_in_directory(
+            os.path.join(tempdir, "tree")
+        )
+        assert os.path.exists(os.path.join(tempdir, "idx.db"))
+
+
+def test_server_returns_stats(server):
+    _, socket_path = server
+    with tempfile.TemporaryDirectory() as tempdir:
+        write_file(os.path.join(tempdir, "a.txt"), "a")
+
+        response = request_render(["."], socket_path, cwd=tempdir)
+        assert response["stats"] is None
+
+        response = request_render([".", "--stats"], socket_path, cwd=tempdir)
+        assert response["stats"]["files"] == 1
+
+
+def test_client_refuses_socket_of_another_user(server):
+    _, socket_path = server
+    with mock.patch("os.getuid", return_value=os.getuid() + 1):
+        with pytest.raises(PermissionError):
+            request_render(["."], socket_path)
+
+
+def test_client_writes_where_its_own_options_say(server, capsys):
+    _, socket_path = server
+    with tempfile.TemporaryDirectory() as tempdir:
+        write_file(os.path.join(tempdir, "a.txt"), "Hello daemon")
+        output_file = os.path.join(tempdir, "out.txt")
+
+        argv = ["slimer-client", tempdir, "-o", output_file, "--stats"]
+        with mock.patch.dict(os.environ, {"SLIMER_SOCKET": socket_path}):
+            with mock.patch.object(sys, "argv", argv):
+                with pytest.raises(SystemExit) as exit_info:
+                    client.main()
+        assert exit_info.value.code == 0
+        with open(output_file) as file:
+            assert "Hello daemon" in file.read()
+        assert "Files displayed: 1" in capsys.readouterr().err
+
+        argv = ["slimer-client", tempdir, "-o", os.path.join(tempdir, "no", "out")]
+        with mock.patch.dict(os.environ, {"SLIMER_SOCKET": socket_path}):
+            with mock.patch.object(sys, "argv", argv):
+                with pytest.raises(SystemExit) as exit_info:
+                    client.main()
+        assert exit_info.value.code == 1
+        assert "An unexpected error occurred" in capsys.readouterr().err
+
+
+def test_server_streams_sections(server):
+    _, socket_path = server
+    with tempfile.TemporaryDirectory() as tempdir:
+        for name in ("a.txt", "b.txt"):
+            write_file(os.path.join(tempdir, name), name)
+
+        messages = list(iter_render(["."], socket_path, cwd=tempdir))
+        assert messages[-1] == {"status": 0, "stats": None}
+        sections = [message["section"] for message in messages[:-1]]
+        assert len(sections) > 1
+        assert "".join(sections) == display_files_in_directory(tempdir)
@@ -0,0 +1,195 @@
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from slimer.sinks import (
+    ClipboardSink,
+    FileContentSection,
+    TeeSink,
+    find_clipboard_command,
+    get_shard_path,
+    open_sink,
+)
+
+
+def shell_command(script):
+    return [sys.executable, "-c", script]
+
+
+def test_clipboard_sink_streams_to_helper():
+    with tempfile.TemporaryDirectory() as tempdir:
+        received = os.path.join(tempdir, "received.txt")
+        command = shell_command(
+            f"import sys; open({received!r}, 'wb').write(sys.stdin.buffer.read())"
+        )
+
+        with ClipboardSink(command) as sink:
+            sink.write("first ")
+            sink.write("sécond")
+
+        with open(received, encoding="utf-8") as f:
+            assert f.read() == "first sécond"
+
+
+def test_clipboard_sink_reports_helper_failure():
+    sink = ClipboardSink(shell_command("import sys; sys.exit(3)"))
+    with pytest.raises(RuntimeError, match="status 3"):
+        sink.close()
+
+
+def test_clipboard_sink_falls_back_to_pyperclip():
+    with patch("slimer.sinks.find_clipboard_command", return_value=None), patch(
+        "pyperclip.copy"
+    ) as mock_copy:
+        with open_sink(copy_to_clipboard=True) as sink:
+            sink.write("first ")
+            sink.write("second")
+
+    mock_copy.assert_called_once_with("first second")
+
+
+def test_clipboard_sink_fails_past_max_memory():
+    with patch("slimer.sinks.find_clipboard_command", return_value=None), patch(
+        "pyperclip.copy"
+    ) as mock_copy:
+        with pytest.raises(RuntimeError, match="--max-memory"):
+            with open_sink(copy_to_clipboard=True, max_memory=8) as sink:
+                sink.write("first ")
+                sink.write("sécond")
+
+    mock_copy.assert_not_called()
+
+
+def test_find_clipboard_command_without_display(monkeypatch):
+    monkeypatch.setattr(sys, "platform", "linux")
+    monkeypatch.delenv("DISPLAY", raising=False)
+    monkeypatch.delenv("WAYLAND_DISPLAY", raising=False)
+    assert find_clipboard_command() is None
+
+
+@pytest.mark.parametrize("extension", [".gz", ".xz"])
+def test_file_sink_compresses_output(extension):
+    import gzip
+    import lzma
+
+    decompress = gzip.open if extension == ".gz" else lzma.open
+    with tempfile.TemporaryDirectory() as tempdir:
+        output_file = os.path.join(tempdir, "output.txt" + extension)
+        with open_sink(False, output_file, compression_level=1) as sink:
+            sink.write("first ")
+            sink.write("sécond")
+
+        with decompress(output_file, "rt", encoding="utf-8") as f:
+            assert f.read() == "first sécond"
+
+
+def read_shards(tempdir):
+    shards = []
+    for name in sorted(os.listdir(tempdir)):
+        with open(os.path.join(tempdir, name), encoding="utf-8") as f:
+            shards.append((name, f.read()))
+    return shards
+
+
+def file_section(name, content, depth=0):
+    padding = "  " * depth
+    return f"{padding}-- {name:<40}\n```python\n{content}\n```\n"
+
+
+def test_sharded_sink_cuts_between_sections():
+    sections = [
+        "/src:\n",
+        file_section("a.py", "print('a')", depth=1),
+        file_section("b.py", "print('b')", depth=1),
+        file_section("c.py", "print('c')"),
+    ]
+    with tempfile.TemporaryDirectory() as tempdir:
+        with open_sink(False, os.path.join(tempdir, "out.md"), shard_size=120) as sink:
+            for section in sections:
+                sink.write(section)
+
+        shards = read_shards(tempdir)
+        assert [name for name, _ in shards] == [
+            "out.001.md",
+            "out.002.md",
+            "out.003.md",
+        ]
+        assert shards[0][1] == (
+            "Shard 1 contents:\n/src:\n  -- a.py\n\n" + sections[0] + sections[1]
+        )
+        # The directory a shard starts in is repeated in its tree header
+        assert shards[1][1] == "Shard 2 contents:\n/src:\n  -- b.py\n\n" + sections[2]
+        assert shards[2][1] == "Shard 3 contents:\n-- c.py\n\n" + sections[3]
+
+
+def test_sharded_sink_splits_oversized_files_into_fenced_parts():
+    content = "\n".join(f"line_{index} = {index}" for index in range(40))
+    with tempfile.TemporaryDirectory() as tempdir:
+        with open_sink(
+            False, os.path.join(tempdir, "out.md"), shard_size=50, shard_unit="tokens"
+        ) as sink:
+            sink.write(file_section("big.py", content))
+
+        shards = read_shards(tempdir)
+        assert len(shards) > 1
+        parts = []
+        for index, (_, shard) in enumerate(shards, start=1):
+            assert len(shard) <= 50 * 4
+            header, body = shard.split("\n\n", 1)
+            assert f"-- big.py (part {index}/{len(shards)})" in header
+            assert body.startswith(
+                f"-- big.py (part {index}/{len(shards)})\n```python\n"
+            )
+            assert body.endswith("```\n")
+            parts.append(body.split("\n", 2)[2][: -len("```\n")])
+        assert "".join(parts) == content + "\n"
+
+
+def test_sharded_sink_closes_fences_of_lines_cut_in_parts():
+    with tempfile.TemporaryDirectory() as tempdir:
+        with open_sink(False, os.path.join(tempdir, "out.md"), shard_size=2000) as sink:
+            sink.write(file_section("long.txt", "x" * 5000))
+
+        shards = read_shards(tempdir)
+        assert len(shards) > 2
+        for _, shard in shards:
+            assert len(shard) <= 2000
+            assert shard.endswith("x\n```\n")
+
+
+def test_get_shard_path_keeps_compression_extension():
+    assert get_shard_path("out.md", 2) == "out.002.md"
+    assert get_shard_path("out.md.gz", 12) == "out.012.md.gz"
+
+
+def test_tee_sink_feeds_every_destination_from_one_render(capsys):
+    with tempfile.TemporaryDirectory() as tempdir, patch(
+        "slimer.sinks.find_clipboard_command", return_value=None
+    ), patch("pyperclip.copy") as mock_copy:
+        source = os.path.join(tempdir, "a.py")
+        with open(source, "w") as f:
+            f.write("x = 1\n")
+        output_file = os.path.join(tempdir, "out.md")
+
+        with open_sink(True, output_file, print_output=True) as sink:
+            assert isinstance(sink, TeeSink)
+            sink.write("tree\n")
+            sink.write(FileContentSection("```python\n", source, 6, "```\n"))
+
+        expected = "tree\n```python\nx = 1\n```\n"
+        with open(output_file) as f:
+            assert f.read() == expected
+    mock_copy.assert_called_once_with(expected)
+    assert capsys.readouterr().out == expected + "\n"
+
+
+def test_open_sink_prints_only_when_no_other_destination():
+    with tempfile.TemporaryDirectory() as tempdir:
+        output_file = os.path.join(tempdir, "out.md")
+        with open_sink(False, output_file) as sink:
+            assert not isinstance(sink, TeeSink)
+        with open_sink(False, print_output=True) as sink:
+            assert not isinstance(sink, TeeSink)
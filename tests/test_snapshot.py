@@ -0,0 +1,87 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+from slimer.main import get_directory_output, main, parse_arguments
+from tests.conftest import write_file
+
+
+def render_delta(root, snapshot_path, *options):
+    args = parse_arguments([root, "--since-snapshot", snapshot_path, *options])
+    return get_directory_output(args, root)
+
+
+def test_since_snapshot_displays_only_changes():
+    with tempfile.TemporaryDirectory() as tempdir:
+        root = os.path.join(tempdir, "root")
+        os.makedirs(os.path.join(root, "sub"))
+        write_file(os.path.join(root, "kept.txt"), "kept\n")
+        write_file(os.path.join(root, "sub", "edited.py"), "a = 1\nb = 2\n", 10**9)
+        write_file(os.path.join(root, "removed.txt"), "removed\n")
+        snapshot_path = os.path.join(tempdir, "snapshot.json")
+
+        first = render_delta(root, snapshot_path)
+        assert first.startswith("Changes since the snapshot: 3 added, 0 modified")
+        assert render_delta(root, snapshot_path) == "No changes since the snapshot.\n"
+
+        write_file(os.path.join(root, "sub", "edited.py"), "a = 1\nb = 3\n", 2 * 10**9)
+        os.remove(os.path.join(root, "removed.txt"))
+        write_file(os.path.join(root, "added.txt"), "added\n")
+
+        assert render_delta(root, snapshot_path) == (
+            "Changes since the snapshot: 1 added, 1 modified, 1 removed.\n\n"
+            f"-- added: added.txt\n-- {'added.txt':<40}\n```\nadded\n\n```\n"
+            "-- modified: sub/edited.py\n"
+            "````diff\n"
+            "--- a/sub/edited.py\n"
+            "+++ b/sub/edited.py\n"
+            "@@ -1,6 +1,6 @@\n"
+            f"   -- {'edited.py':<40}\n"
+            " ```python\n"
+            " a = 1\n"
+            "-b = 2\n"
+            "+b = 3\n"
+            " \n"
+            " ```\n"
+            "````\n"
+            "-- removed: removed.txt\n"
+        )
+
+
+def test_since_snapshot_renders_again_with_other_options():
+    with tempfile.TemporaryDirectory() as tempdir:
+        write_file(os.path.join(tempdir, "a.txt"), "0123456789\n")
+        snapshot_path = os.path.join(tempdir, "..", os.path.basename(tempdir) + ".json")
+
+        try:
+            render_delta(tempdir, snapshot_path)
+            output = render_delta(tempdir, snapshot_path, "-l", "4")
+        finally:
+            os.remove(snapshot_path)
+
+        assert "0 added, 1 modified, 0 removed" in output
+        assert "+0123...[more content...]\n" in output
+
+
+def test_since_snapshot_is_kept_when_the_output_fails():
+    with tempfile.TemporaryDirectory() as tempdir:
+        root = os.path.join(tempdir, "root")
+        os.mkdir(root)
+        write_file(os.path.join(root, "a.txt"), "a\n")
+        snapshot_path = os.path.join(tempdir, "snapshot.json")
+        argv = ["slimer", root, "--since-snapshot", snapshot_path, "-c"]
+
+        with patch("sys.argv", argv), patch(
+            "slimer.sinks.find_clipboard_command", return_value=None
+        ), patch("pyperclip.copy", side_effect=RuntimeError("no clipboard")), patch(
+            "builtins.print"
+        ):
+            main()
+        assert not os.path.exists(snapshot_path)
+
+        with patch("sys.argv", argv), patch(
+            "slimer.sinks.find_clipboard_command", return_value=None
+        ), patch("pyperclip.copy") as mock_copy:
+            main()
+        assert "1 added" in mock_copy.call_args[0][0]
+        assert os.path.exists(snapshot_path)